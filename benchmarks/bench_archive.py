@@ -0,0 +1,90 @@
+"""公告归档查询基准 - 生成若干公告写入临时归档，测量常见查询的耗时
+
+依次报告：
+- 写入耗时；
+- 按企业 + 日期范围、按关键词（全文索引与短关键词逐行匹配）、组合条件查询的耗时。
+
+在仓库根目录运行：
+
+    python benchmarks/bench_archive.py --announcements 200000 --companies 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.scrapers.archive import AnnouncementArchive  # noqa: E402
+
+REGIONS = ["北京市", "上海市", "广东省", "浙江省", "四川省", "湖北省", "江苏省", "山东省"]
+PROJECTS = ["信息化建设项目", "医疗设备采购项目", "物业管理服务项目", "道路维修工程", "教学设备采购项目"]
+BID_TYPES = ["公开招标", "竞争性磋商", "中标公告", "更正公告", "询价公告"]
+
+
+def generate_rows(count: int, companies: list, seed: int = 1):
+    rng = random.Random(seed)
+    for index in range(count):
+        company = rng.choice(companies)
+        mentioned = rng.sample(companies, 2)
+        region, project, bid_type = rng.choice(REGIONS), rng.choice(PROJECTS), rng.choice(BID_TYPES)
+        day = f"20{rng.randint(22, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        yield {
+            '标题': f"{region}某单位{project}{bid_type}",
+            '发布日期': f"{day} 09:{rng.randint(0, 59):02d}",
+            '内容摘要': f"{company}参与{region}{project}，{mentioned[0]}、{mentioned[1]}等单位报名",
+            '链接': f"http://www.ccgp.gov.cn/cggg/bench/{index}.htm",
+            '数据来源': "中国政府采购网",
+            '地区': [region],
+            '金额': [round(rng.uniform(1, 500), 2)],
+            '公告类型': bid_type,
+            '匹配公司': [company] + mentioned,
+            '项目编号': f"BENCH-{index:07d}",
+        }
+
+
+def measure(label: str, query, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        total, rows = query()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"  {label:<36}{total:>10}{timings[len(timings) // 2]:>12.2f}{timings[-1]:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="公告归档查询基准")
+    parser.add_argument("--announcements", type=int, default=200000, help="公告数量")
+    parser.add_argument("--companies", type=int, default=2000, help="企业数量")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询的重复次数")
+    args = parser.parse_args()
+
+    companies = [f"基准测试{i:05d}科技有限公司" for i in range(args.companies)]
+    with tempfile.TemporaryDirectory(prefix="bidscrap-archive-") as work_dir:
+        archive = AnnouncementArchive(os.path.join(work_dir, "archive.sqlite3"))
+        rows = list(generate_rows(args.announcements, companies))
+        start = time.perf_counter()
+        for offset in range(0, len(rows), 5000):
+            archive.save("ccgp", rows[offset:offset + 5000])
+        elapsed = time.perf_counter() - start
+        print(f"写入 {len(rows)} 条公告，耗时 {elapsed:.2f} 秒（{len(rows) / elapsed:.0f} 条/秒），"
+              f"全文索引 {'启用' if archive.fts else '未启用'}")
+
+        company = companies[7]
+        print(f"  {'查询':<36}{'总数':>10}{'p50(ms)':>12}{'最大(ms)':>12}")
+        measure("企业 + 日期范围", lambda: archive.query(
+            company=company, start="2023-01-01", end="2023-12-31"), args.repeat)
+        measure("关键词（全文索引）", lambda: archive.query(keyword="医疗设备采购"), args.repeat)
+        measure("关键词（两个字，逐行匹配）", lambda: archive.query(keyword="医疗"), args.repeat)
+        measure("关键词 + 日期范围 + 来源", lambda: archive.query(
+            keyword="物业管理服务", start="2024-03-01", end="2024-03-31", source="ccgp"), args.repeat)
+        measure("企业 + 关键词", lambda: archive.query(company=company, keyword="道路维修"), args.repeat)
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""页面解析微基准 - 比较逐次编译XPath与预编译XPath的单页解析耗时
+
+使用 benchmarks/fixtures 下的中国政府采购网搜索结果页与详情页样本，
+在仓库根目录运行：
+
+    python benchmarks/bench_parse.py --repeat 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lxml import etree  # noqa: E402
+
+from modules.scrapers import load_scrapers  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+COMPANY = "测试科技有限公司"
+
+
+def load_fixture(name: str, company: str = COMPANY) -> str:
+    """读取样本页面并替换关键词占位符"""
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read().replace("__KW__", company).replace("__N__", "0001")
+
+
+def legacy_search_fields(scraper, html_text: str) -> list:
+    """原实现：每个条目、每个字段临时拼接并编译XPath"""
+    rows = []
+    html = etree.HTML(html_text)
+    for item in html.xpath(scraper.site_config["result_selector"]):
+        data = {}
+        for field_name, config in scraper.field_extractors.items():
+            selector = config["selector"]
+            attribute = config.get("attribute", "text")
+            if attribute == "text":
+                value = "".join(item.xpath(f"{selector}/text()")).strip()
+            else:
+                value = "".join(item.xpath(f"{selector}/@{attribute}")).strip()
+            data[field_name] = value
+        rows.append(data)
+    return rows
+
+
+def compiled_search_fields(scraper, html_text: str) -> list:
+    """预编译实现：使用注册时编译的 etree.XPath"""
+    selectors = scraper.get_compiled_selectors()
+    html = etree.HTML(html_text)
+    return [
+        {field_name: "".join(xpath(item)).strip() for field_name, xpath in selectors["fields"].items()}
+        for item in selectors["result"](html)
+    ]
+
+
+def legacy_detail_fields(scraper, html_text: str) -> dict:
+    """原实现：详情页每个选择器字符串都重新编译"""
+    details = {}
+    html = etree.HTML(html_text)
+    for field_name, config in scraper.detail_config["fields"].items():
+        for selector in config.get("selectors", []):
+            value = "".join(html.xpath(selector)).strip()
+            if value:
+                details[field_name] = value
+                break
+    return details
+
+
+def compiled_detail_fields(scraper, html_text: str) -> dict:
+    """预编译实现：详情页选择器使用编译后的 etree.XPath"""
+    details = {}
+    html = etree.HTML(html_text)
+    for field_name, xpaths in scraper.get_compiled_selectors()["detail"].items():
+        for xpath in xpaths:
+            value = "".join(xpath(html)).strip()
+            if value:
+                details[field_name] = value
+                break
+    return details
+
+
+def measure(func, repeat: int) -> float:
+    """返回单次调用的平均耗时（微秒）"""
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="页面解析微基准")
+    parser.add_argument("--scraper", default="ccgp", help="爬虫名称")
+    parser.add_argument("--repeat", type=int, default=1000, help="每项测量的重复次数")
+    args = parser.parse_args()
+
+    scraper = load_scrapers()[args.scraper]
+    search_page = load_fixture("ccgp_search.html")
+    detail_page = load_fixture("ccgp_detail.html")
+
+    # 两种实现的提取结果必须一致
+    assert legacy_search_fields(scraper, search_page) == compiled_search_fields(scraper, search_page)
+    assert legacy_detail_fields(scraper, detail_page) == compiled_detail_fields(scraper, detail_page)
+
+    cases = [
+        ("搜索结果页字段", legacy_search_fields, compiled_search_fields, search_page),
+        ("详情页字段", legacy_detail_fields, compiled_detail_fields, detail_page),
+    ]
+    print(f"{'阶段':<12}{'逐次编译(us)':>14}{'预编译(us)':>14}{'加速比':>10}")
+    for label, legacy, compiled, page in cases:
+        before = measure(lambda: legacy(scraper, page), args.repeat)
+        after = measure(lambda: compiled(scraper, page), args.repeat)
+        print(f"{label:<12}{before:>14.1f}{after:>14.1f}{before / after:>9.2f}x")
+
+    # 完整的单页处理（解析、公司匹配与结果构建），供参考
+    total = measure(lambda: scraper.extract_search_items(search_page, COMPANY), max(args.repeat // 10, 1))
+    details = measure(lambda: scraper.parse_detail_page(detail_page), args.repeat)
+    print(f"extract_search_items 每页 {total:.1f} us，parse_detail_page 每页 {details:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""代理池基准 - 在本地启动模拟站点与若干延迟、失败率不同的模拟代理，检验代理池
+
+依次报告：
+- 并发检测全部代理的耗时与检测结果；
+- 经代理池选择代理发送请求时各代理的使用次数与成功率（应集中在快速、稳定的代理上）；
+- 会话固定代理的情况（代理健康时同一会话始终使用同一代理）。
+
+在仓库根目录运行：
+
+    python benchmarks/bench_proxy_pool.py --requests 400 --sessions 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+
+from mock_proxy import MockProxy  # noqa: E402
+from mock_server import MockSite  # noqa: E402
+from modules.scrapers.proxy_pool import ProxyPool  # noqa: E402
+
+# (延迟秒数, 失败率)；最后一个地址没有代理在监听
+PROXY_PROFILES = [(0.01, 0.0), (0.03, 0.0), (0.08, 0.0), (0.02, 0.5), (0.2, 0.0)]
+
+
+async def start_app(app: web.Application) -> (web.AppRunner, int):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, port
+
+
+async def run(args):
+    runners = []
+    site_runner, site_port = await start_app(MockSite(pages=1, seed=1).create_app())
+    runners.append(site_runner)
+    proxies = {}
+    for index, (latency, fail_rate) in enumerate(PROXY_PROFILES):
+        runner, port = await start_app(MockProxy(latency, fail_rate, seed=index).create_app())
+        runners.append(runner)
+        proxies[f"http://127.0.0.1:{port}"] = f"延迟{latency * 1000:.0f}ms 失败率{fail_rate:.0%}"
+    dead = "http://127.0.0.1:9"
+    proxies[dead] = "无法连接"
+
+    try:
+        probe_url = f"http://127.0.0.1:{site_port}/__stats__"
+        pool = ProxyPool(probe_url=probe_url, probe_timeout=2, concurrency=len(proxies), top_n=args.top)
+        pool.update(proxies)
+
+        start = time.perf_counter()
+        available = await pool.validate()
+        print(f"并发检测 {len(proxies)} 个代理，耗时 {time.perf_counter() - start:.2f} 秒，可用 {available} 个")
+        for stats in pool.snapshot():
+            print(f"  {stats['proxy']:<26}{proxies[stats['proxy']]:<20}"
+                  f"延迟 {stats['latency_ms']} ms  健康 {stats['healthy']}")
+
+        used = Counter()
+        outcomes = defaultdict(lambda: [0, 0])
+        pinned = defaultdict(list)
+        url = f"http://127.0.0.1:{site_port}/cggg/bench.htm"
+        semaphore = asyncio.Semaphore(args.sessions)
+
+        async def one(session: aiohttp.ClientSession, index: int):
+            key = index % args.sessions
+            async with semaphore:
+                proxy = pool.acquire(session_key=key)
+                if proxy is None:
+                    return
+                used[proxy] += 1
+                pinned[key].append(proxy)
+                start = time.perf_counter()
+                try:
+                    async with session.get(url, proxy=proxy) as response:
+                        await response.read()
+                        success = response.status == 200
+                except Exception:
+                    success = False
+                pool.record(proxy, success, time.perf_counter() - start)
+                outcomes[proxy][0 if success else 1] += 1
+
+        timeout = aiohttp.ClientTimeout(total=2)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            start = time.perf_counter()
+            await asyncio.gather(*(one(session, i) for i in range(args.requests)))
+            elapsed = time.perf_counter() - start
+
+        total_ok = sum(ok for ok, _ in outcomes.values())
+        print(f"\n发送 {args.requests} 个请求，耗时 {elapsed:.2f} 秒，成功 {total_ok} 个")
+        print(f"{'代理':<26}{'说明':<20}{'使用次数':>8}{'成功':>8}{'失败':>8}")
+        for proxy, label in proxies.items():
+            ok, failed = outcomes.get(proxy, (0, 0))
+            print(f"{proxy:<26}{label:<20}{used.get(proxy, 0):>8}{ok:>8}{failed:>8}")
+
+        switches = sum(sum(1 for a, b in zip(seq, seq[1:]) if a != b) for seq in pinned.values())
+        print(f"\n{args.sessions} 个会话共更换代理 {switches} 次（仅在所固定的代理不再健康时更换）")
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="代理池基准")
+    parser.add_argument("--requests", type=int, default=400, help="经代理发送的请求数")
+    parser.add_argument("--sessions", type=int, default=8, help="并发会话数（每个会话固定一个代理）")
+    parser.add_argument("--top", type=int, default=3, help="加权选择时参与的最快健康代理数")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""模拟HTTP代理 - 转发普通HTTP请求，可配置延迟与失败率，用于测试代理池
+
+只支持明文HTTP的绝对URL请求（aiohttp/requests 通过代理访问 http:// 地址时的形式），
+不支持 CONNECT 隧道。
+
+    python benchmarks/mock_proxy.py --port 8890 --latency 0.05 --fail-rate 0.2
+"""
+import argparse
+import asyncio
+import random
+
+import aiohttp
+from aiohttp import web
+
+# 不转发的逐跳请求头
+HOP_HEADERS = {"connection", "keep-alive", "proxy-connection", "proxy-authorization",
+               "te", "trailer", "transfer-encoding", "upgrade", "host", "content-length"}
+
+
+class MockProxy:
+    """模拟代理：按设定延迟转发请求，以 fail_rate 的概率直接断开连接"""
+
+    def __init__(self, latency: float = 0.0, fail_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self._session = None
+
+    async def forward(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        if self.fail_rate and self.random.random() < self.fail_rate:
+            self.failures += 1
+            # 模拟代理失效：不返回响应直接断开
+            request.transport.close()
+            return web.Response(status=502)
+
+        url = str(request.url)
+        if self._session is None:
+            self._session = aiohttp.ClientSession(auto_decompress=False)
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_HEADERS}
+        body = await request.read()
+        async with self._session.request(request.method, url, headers=headers,
+                                         data=body or None, allow_redirects=False) as upstream:
+            content = await upstream.read()
+            response_headers = {k: v for k, v in upstream.headers.items() if k.lower() not in HOP_HEADERS}
+            return web.Response(status=upstream.status, body=content, headers=response_headers)
+
+    async def close(self, app=None):
+        if self._session is not None:
+            await self._session.close()
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.forward)
+        app.on_cleanup.append(self.close)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模拟HTTP代理")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8890)
+    parser.add_argument("--latency", type=float, default=0.0, help="转发前的延迟(秒)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="直接断开连接的概率")
+    parser.add_argument("--seed", type=int, default=None, help="随机数种子")
+    args = parser.parse_args()
+
+    proxy = MockProxy(args.latency, args.fail_rate, args.seed)
+    web.run_app(proxy.create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
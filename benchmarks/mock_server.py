@@ -0,0 +1,129 @@
+"""模拟招投标网站 - 离线提供搜索结果页与详情页，用于吞吐量基准测试
+
+页面来自 benchmarks/fixtures，占位符在响应时替换：
+    __KW__     搜索关键词（公司名称）
+    __N__      详情页编号
+    __TOTAL__  结果总数
+    __PAGE__   当前页码
+搜索结果中的公告链接改写为指向本服务器，并按关键词和页码区分，保证每条公告URL唯一；
+--shared-rate 指定的比例的公告不区分关键词，模拟同一公告出现在多家企业的搜索结果中。
+
+    python benchmarks/mock_server.py --port 8765 --latency 0.05 --jitter 0.02 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import re
+
+from aiohttp import web
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 搜索结果页中的公告链接
+LINK_PATTERN = re.compile(r'http://www\.ccgp\.gov\.cn/cggg/([\w/]+?)\.htm')
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class MockSite:
+    """模拟站点：可配置延迟、错误率与每个关键词的结果页数"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 pages: int = 2, seed: int = None, retry_after: int = 0, shared_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.pages = pages
+        self.retry_after = retry_after
+        self.shared_rate = shared_rate
+        self.random = random.Random(seed)
+        self.search_page = load_fixture("ccgp_search.html")
+        self.detail_page = load_fixture("ccgp_detail.html")
+        self.items_per_page = len(LINK_PATTERN.findall(self.search_page))
+        self.requests = 0
+        self.errors = 0
+
+    async def delay_or_fail(self):
+        """模拟网络延迟与服务端错误，返回错误响应或None"""
+        self.requests += 1
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after else None
+            return web.Response(status=503, text="Service Unavailable", headers=headers)
+        return None
+
+    async def search(self, request: web.Request) -> web.Response:
+        error = await self.delay_or_fail()
+        if error is not None:
+            return error
+
+        keyword = request.query.get("kw", "")
+        page = int(request.query.get("page_index", "1") or 1)
+        if page > self.pages:
+            # 超出结果页数时返回空列表
+            body = re.sub(r'<ul class="vT-srch-result-list-bid">.*?</ul>',
+                          '<ul class="vT-srch-result-list-bid"></ul>', self.search_page, flags=re.S)
+        else:
+            key = hashlib.md5(keyword.encode("utf-8")).hexdigest()[:8]
+            base = f"http://{request.host}/cggg/"
+            body = LINK_PATTERN.sub(lambda m: f"{base}{m.group(1)}_{self.link_key(m.group(1), key)}_{page}.htm",
+                                    self.search_page)
+        body = (body.replace("__KW__", keyword)
+                .replace("__TOTAL__", str(self.pages * self.items_per_page))
+                .replace("__PAGE__", str(page)))
+        return web.Response(text=body, content_type="text/html")
+
+    def link_key(self, path: str, keyword_key: str) -> str:
+        """公告链接中区分关键词的部分，共享的公告固定为 shared"""
+        if self.shared_rate and int(hashlib.md5(path.encode("utf-8")).hexdigest()[:4], 16) < self.shared_rate * 0x10000:
+            return "shared"
+        return keyword_key
+
+    async def detail(self, request: web.Request) -> web.Response:
+        error = await self.delay_or_fail()
+        if error is not None:
+            return error
+
+        number = hashlib.md5(request.path.encode("utf-8")).hexdigest()[:6]
+        body = self.detail_page.replace("__N__", number).replace("__KW__", "某市人民医院")
+        return web.Response(text=body, content_type="text/html")
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": self.requests, "errors": self.errors})
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/bxsearch", self.search)
+        app.router.add_get("/cggg/{tail:.*}", self.detail)
+        app.router.add_get("/__stats__", self.stats)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模拟招投标网站")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="平均响应延迟(秒)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟的随机浮动范围(秒)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回503的概率")
+    parser.add_argument("--pages", type=int, default=2, help="每个关键词的结果页数")
+    parser.add_argument("--seed", type=int, default=None, help="随机数种子")
+    parser.add_argument("--retry-after", type=int, default=0, help="503响应附带的 Retry-After 秒数，0 表示不附带")
+    parser.add_argument("--shared-rate", type=float, default=0.0, help="不区分关键词（各公司共享）的公告比例")
+    args = parser.parse_args()
+
+    site = MockSite(args.latency, args.jitter, args.error_rate, args.pages, args.seed, args.retry_after,
+                    args.shared_rate)
+    web.run_app(site.create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""抓取吞吐量基准 - 针对本地模拟站点运行爬虫并报告各阶段耗时
+
+统计内容：请求数与每秒请求数、各阶段（搜索页请求、详情页请求、搜索页解析、
+详情页解析、单个搜索任务）的 p50/p99 耗时、CPU时间与峰值内存。
+结果可保存为JSON，并与之前保存的结果对比，用于比较不同提交的性能。
+
+在仓库根目录运行：
+
+    python benchmarks/run_benchmark.py --companies 50 --spawn-server --latency 0.05 --json after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import config  # noqa: E402
+from modules.scrapers.sessions import close_session_pools  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class StageTimer:
+    """按阶段记录耗时（秒）"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def wrap_async(self, scraper, method: str, stage_of):
+        """包装爬虫的异步类方法，stage_of 根据调用参数返回阶段名称（None 表示不记录）"""
+        original = getattr(scraper, method)
+
+        async def timed(cls, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                stage = stage_of(*args, **kwargs)
+                if stage:
+                    self.samples[stage].append(time.perf_counter() - start)
+
+        setattr(scraper, method, classmethod(timed))
+
+    def wrap_sync(self, scraper, method: str, stage: str):
+        """包装爬虫的同步类方法"""
+        original = getattr(scraper, method)
+
+        def timed(cls, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - start)
+
+        setattr(scraper, method, classmethod(timed))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {stage: summarize(values) for stage, values in sorted(self.samples.items())}
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
+
+
+def cpu_seconds() -> Optional[float]:
+    """当前进程及已结束子进程的CPU时间"""
+    if resource is None:
+        return time.process_time()
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # Linux 下 ru_maxrss 单位为KB，macOS 为字节
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_mock_server(args) -> subprocess.Popen:
+    """启动模拟站点子进程并等待端口可用"""
+    command = [
+        sys.executable, os.path.join(ROOT, "benchmarks", "mock_server.py"),
+        "--port", str(args.port), "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate), "--pages", str(args.pages), "--seed", "1",
+        "--retry-after", str(args.retry_after), "--shared-rate", str(args.shared_rate),
+    ]
+    process = subprocess.Popen(command)
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", args.port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("模拟站点启动失败")
+
+
+def configure(args, work_dir: str):
+    """将爬虫指向模拟站点，并隔离缓存与状态文件"""
+    config.OUTPUT_DIR = work_dir
+    config.HTTP_CACHE_ENABLED = args.cache
+    config.TASK_STORE_BACKEND = "memory"
+    config.SEARCH_CONCURRENCY = args.concurrency
+
+    from modules import module_manager
+    module_manager.discover_modules()
+    scraper = module_manager.scrapers[args.scraper]
+    base = f"http://127.0.0.1:{args.port}/"
+    scraper.site_config = dict(
+        scraper.site_config,
+        search_url=f"{base}bxsearch",
+        base_url=base,
+        rate_limit=args.rate_limit,
+        max_pages=args.pages + 1,
+    )
+    scraper.max_concurrency = args.concurrency
+    scraper.use_process_pool = args.process_pool
+    return module_manager, scraper
+
+
+def instrument(scraper) -> StageTimer:
+    timer = StageTimer()
+    timer.wrap_async(scraper, "make_request",
+                     lambda url, *a, cache=None, **kw: f"{cache or 'other'}_request")
+    timer.wrap_async(scraper, "scrape", lambda *a, **kw: "search_job")
+    if scraper.use_process_pool:
+        timer.wrap_async(scraper, "run_parse", lambda method, *a, **kw: method)
+    else:
+        timer.wrap_sync(scraper, "extract_search_items", "extract_search_items")
+        timer.wrap_sync(scraper, "parse_detail_page", "parse_detail_page")
+    return timer
+
+
+async def run_scrape(scraper, companies: List[str], args) -> int:
+    """并发调用 scraper.scrape（受 --concurrency 限制）"""
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(company):
+        async with semaphore:
+            return await scraper.scrape(company, args.start_date, args.end_date)
+
+    try:
+        results = await asyncio.gather(*(one(company) for company in companies))
+    finally:
+        await close_session_pools()
+    return sum(len(rows) for rows in results)
+
+
+async def run_execute_search(companies: List[str], args) -> int:
+    """通过 execute_search 运行完整的搜索任务（包含调度、进度事件与导出）"""
+    from modules.api import routes
+    task_id = "benchmark"
+    routes.task_store.create(task_id, {"status": "started", "total_companies": len(companies), "log": []})
+    try:
+        await routes.execute_search(task_id, companies, args.start_date, args.end_date)
+    finally:
+        await close_session_pools()
+    state = routes.task_store.get(task_id)
+    if state.get("status") != "completed":
+        raise RuntimeError(f"搜索任务失败: {state.get('error')}")
+    return state.get("count", 0)
+
+
+def compare(current: dict, baseline_path: str):
+    """打印与基准结果的对比"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n与 {baseline_path} ({baseline.get('commit')}) 对比:")
+
+    def line(label, before, after, lower_is_better=True):
+        if before is None or after is None:
+            return
+        change = (after - before) / before * 100 if before else 0.0
+        better = change < 0 if lower_is_better else change > 0
+        print(f"  {label:<32}{before:>12.2f}{after:>12.2f}{change:>+9.1f}% {'↑' if better else '↓'}")
+
+    line("requests_per_sec", baseline.get("requests_per_sec"), current["requests_per_sec"], False)
+    line("elapsed_s", baseline.get("elapsed_s"), current["elapsed_s"])
+    line("cpu_s", baseline.get("cpu_s"), current["cpu_s"])
+    line("peak_rss_mb", baseline.get("peak_rss_mb"), current["peak_rss_mb"])
+    for stage, stats in current["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if old:
+            line(f"{stage} p50_ms", old["p50_ms"], stats["p50_ms"])
+            line(f"{stage} p99_ms", old["p99_ms"], stats["p99_ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抓取吞吐量基准")
+    parser.add_argument("--mode", choices=["scrape", "execute"], default="scrape",
+                        help="scrape：直接调用爬虫；execute：运行完整的 execute_search 任务")
+    parser.add_argument("--scraper", default="ccgp")
+    parser.add_argument("--companies", type=int, default=20, help="公司数量")
+    parser.add_argument("--concurrency", type=int, default=8, help="同时执行的搜索任务数")
+    parser.add_argument("--port", type=int, default=8765, help="模拟站点端口")
+    parser.add_argument("--spawn-server", action="store_true", help="自动启动模拟站点")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟站点平均延迟(秒)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="模拟站点延迟浮动(秒)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟站点错误率")
+    parser.add_argument("--retry-after", type=int, default=0, help="模拟站点503响应的 Retry-After 秒数")
+    parser.add_argument("--shared-rate", type=float, default=0.0, help="模拟站点中各公司共享的公告比例")
+    parser.add_argument("--pages", type=int, default=2, help="每个公司的结果页数")
+    parser.add_argument("--rate-limit", type=float, default=0, help="每主机每秒请求数，0 表示不限制")
+    parser.add_argument("--cache", action="store_true", help="启用HTTP响应缓存（默认关闭）")
+    parser.add_argument("--process-pool", action="store_true", help="在解析进程池中解析页面")
+    parser.add_argument("--start-date", default="2024:01:01")
+    parser.add_argument("--end-date", default="2024:12:31")
+    parser.add_argument("--label", default="", help="本次运行的标签")
+    parser.add_argument("--json", help="保存结果的JSON文件")
+    parser.add_argument("--compare", help="与之前保存的JSON结果对比")
+    args = parser.parse_args()
+
+    server = start_mock_server(args) if args.spawn_server else None
+    try:
+        with tempfile.TemporaryDirectory(prefix="bidscrap-bench-") as work_dir:
+            module_manager, scraper = configure(args, work_dir)
+            timer = instrument(scraper)
+            companies = [f"基准测试{i:04d}科技有限公司" for i in range(args.companies)]
+
+            cpu_before = cpu_seconds()
+            start = time.perf_counter()
+            if args.mode == "execute":
+                rows = asyncio.run(run_execute_search(companies, args))
+            else:
+                rows = asyncio.run(run_scrape(scraper, companies, args))
+            elapsed = time.perf_counter() - start
+
+            # 等待解析子进程退出，使其CPU时间计入 RUSAGE_CHILDREN
+            from modules.scrapers.archive import close_archive
+            from modules.scrapers.cache import close_response_cache
+            from modules.scrapers.transport import shutdown_executor
+            from modules.scrapers.watermark import close_watermark_store
+            from modules.scrapers.workers import shutdown_process_pool
+            shutdown_process_pool(wait=True)
+            cpu_used = cpu_seconds() - cpu_before
+            shutdown_executor()
+            close_response_cache()
+            close_watermark_store()
+            close_archive()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    stages = timer.summary()
+    requests = sum(stats["count"] for stage, stats in stages.items() if stage.endswith("_request"))
+    report = {
+        "label": args.label,
+        "commit": git_commit(),
+        "params": {key: value for key, value in vars(args).items() if key not in ("json", "compare")},
+        "rows": rows,
+        "requests": requests,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_sec": round(requests / elapsed, 1) if elapsed else 0.0,
+        "cpu_s": round(cpu_used, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+    }
+
+    print(f"公司 {args.companies}，结果 {rows} 条，请求 {requests} 次，耗时 {report['elapsed_s']} 秒，"
+          f"{report['requests_per_sec']} 请求/秒，CPU {report['cpu_s']} 秒，峰值内存 {report['peak_rss_mb']} MB")
+    print(f"{'阶段':<24}{'次数':>8}{'p50(ms)':>12}{'p99(ms)':>12}{'平均(ms)':>12}")
+    for stage, stats in stages.items():
+        print(f"{stage:<24}{stats['count']:>8}{stats['p50_ms']:>12.2f}{stats['p99_ms']:>12.2f}{stats['mean_ms']:>12.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
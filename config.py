@@ -44,4 +44,63 @@ DEFAULT_START_DATE = three_months_ago.strftime("%Y:%m:%d")
 DEFAULT_END_DATE = today.strftime("%Y:%m:%d")
 
 # 输出文件路径
-OUTPUT_DIR = "outputs" 
\ No newline at end of file
+OUTPUT_DIR = "outputs"
+
+# 结果导出格式：xlsx、csv 或 jsonl
+EXPORT_FORMAT = "xlsx"
+
+# 同步HTTP会话（requests）请求使用的线程池大小
+HTTP_THREAD_POOL_SIZE = 16
+
+# HTTP会话池（每个爬虫在应用启动时创建，关闭时释放，各搜索任务共享连接）
+HTTP_SESSION_POOL_SIZE = 2  # 每个爬虫的长期会话数
+HTTP_SESSION_MAX_AGE = 3600  # 会话最长使用时间(秒)，到期且空闲时重建（更换User-Agent与Cookie）
+HTTP_POOL_CONNECTIONS = 64  # 每个会话的最大连接数
+HTTP_POOL_CONNECTIONS_PER_HOST = 16  # 每个会话对同一主机的最大连接数
+HTTP_KEEPALIVE_TIMEOUT = 30  # 空闲连接的保活时间(秒)
+HTTP_DNS_CACHE_TTL = 300  # DNS解析结果缓存时间(秒)
+
+# 搜索任务并发控制
+SEARCH_CONCURRENCY = 8  # 同时执行的 (公司, 爬虫) 搜索任务上限
+SCRAPER_CONCURRENCY = 4  # 爬虫未声明 max_concurrency 时的默认并发上限
+DETAIL_CONCURRENCY_PER_HOST = 4  # 同一主机详情页的默认并发请求上限
+PARSE_PROCESS_WORKERS = 0  # 解析进程池的进程数（爬虫设置 use_process_pool 时使用），0 表示CPU核数
+
+# HTTP响应缓存（存储于 OUTPUT_DIR/cache 目录）
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_SEARCH_TTL = 6 * 3600  # 搜索结果页缓存时间(秒)
+HTTP_CACHE_DETAIL_TTL = 30 * 24 * 3600  # 公告详情页缓存时间(秒)
+HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 缓存总大小上限(字节)
+
+# 公告归档（SQLite全文索引，存储于 OUTPUT_DIR/state 目录）
+ARCHIVE_ENABLED = True  # 保存抓取到的公告；已完整抓取过的日期窗口直接从归档读取
+ARCHIVE_QUERY_LIMIT = 500  # 归档查询每次返回的最大条数
+
+# 任务进度存储
+TASK_STORE_BACKEND = "memory"  # memory：单进程内存存储；sqlite：持久化并可在多个worker间共享
+TASK_STORE_MAX_TASKS = 200  # 最多保留的任务数
+TASK_STORE_TTL = 24 * 3600  # 任务最后更新后的保留时间(秒)
+TASK_STORE_MAX_EVENTS = 2000  # 每个任务保留的进度事件数
+SSE_KEEPALIVE_INTERVAL = 15  # 无新事件时发送保活注释的间隔(秒)
+
+# 实体提取设置
+GAZETTEER_FILE = None  # 地名词表文件路径，None 使用内置词表 modules/scrapers/data/gazetteer.txt
+
+# 请求重试与熔断
+REQUEST_MAX_RETRIES = 3  # 超时、连接错误、429及5xx响应的最大重试次数
+RETRY_AFTER_MAX = 60  # 服务器 Retry-After 要求的等待时间上限(秒)
+CIRCUIT_BREAKER_THRESHOLD = 5  # 同一主机连续失败多少次后暂停对其请求
+CIRCUIT_BREAKER_COOLDOWN = 10  # 暂停请求的冷却时间(秒)，试探请求失败时加倍
+CIRCUIT_BREAKER_MAX_COOLDOWN = 120  # 冷却时间上限(秒)
+
+# 代理池设置（爬虫 site_config 中 use_proxy 为 True 时使用）
+PROXY_LIST = []  # 静态代理列表，如 ["http://127.0.0.1:8888"]
+PROXY_API_URL = None  # 代理获取API，返回代理列表或 {"proxies": [...]}
+PROXY_API_KEY = None
+PROXY_PROBE_URL = "http://www.ccgp.gov.cn/"  # 代理健康检查的探测地址
+PROXY_PROBE_TIMEOUT = 10  # 单次探测超时时间(秒)
+PROXY_VALIDATE_CONCURRENCY = 20  # 并发探测的代理数
+PROXY_VALIDATE_INTERVAL = 600  # 重新检测全部代理的间隔(秒)
+PROXY_SELECT_TOP = 5  # 在最快的几个健康代理中加权选择
+PROXY_MIN_SUCCESS_RATE = 0.5  # 成功率低于该值的代理视为不健康
+PROXY_MAX_CONSECUTIVE_FAILURES = 3  # 连续失败达到该次数的代理视为不健康
@@ -31,10 +31,17 @@ os.makedirs(config.OUTPUT_DIR, exist_ok=True)
 
 # 加载所有模块
 from modules import module_manager
+from modules.scrapers import transport
+from modules.scrapers.archive import close_archive
+from modules.scrapers.cache import close_response_cache
+from modules.scrapers.sessions import close_session_pools, start_session_pools
+from modules.scrapers.watermark import close_watermark_store
+from modules.scrapers.workers import shutdown_process_pool
 module_manager.discover_modules()
 
 # 导入API路由
 from modules.api import router
+from modules.api.routes import task_store
 app.include_router(router)
 
 # 示例代码，检查是否有类似这样的内容
@@ -45,6 +52,19 @@ async def startup_event():
     """应用启动时执行"""
     logger.info("==== 招投标信息抓取系统启动 ====")
     logger.info(f"模块系统已加载 {len(module_manager.parsers)} 个文件解析器和 {len(module_manager.scrapers)} 个爬虫")
+    await start_session_pools(module_manager.scrapers.values())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时执行"""
+    await close_session_pools()
+    transport.shutdown_executor()
+    shutdown_process_pool()
+    close_response_cache()
+    close_watermark_store()
+    close_archive()
+    task_store.close()
+    logger.info("==== 招投标信息抓取系统关闭 ====")
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=3000, reload=True) 
\ No newline at end of file
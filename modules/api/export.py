@@ -0,0 +1,188 @@
+"""结果导出 - 流式写入Excel/CSV/JSONL，内存占用不随结果数量增长"""
+import asyncio
+import csv
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("bidscrap")
+
+# 结果项的基础列，与 AbstractScraper.build_result_item 保持一致
+BASE_COLUMNS = ['公司名称', '名单写法', '标题', '发布日期', '内容摘要', '链接', '数据来源', '地区', '金额', '公告类型', '匹配公司']
+
+# Excel单元格的最大字符数
+EXCEL_CELL_LIMIT = 32767
+
+MEDIA_TYPES = {
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".csv": "text/csv",
+    ".jsonl": "application/x-ndjson",
+}
+
+
+def result_columns(scrapers: Iterable[Any]) -> List[str]:
+    """根据爬虫配置确定导出列：基础列 + 各爬虫启用的详情字段"""
+    columns = list(BASE_COLUMNS)
+    for scraper in scrapers:
+        detail_config = getattr(scraper, "detail_config", {}) or {}
+        if not detail_config.get("enabled", False):
+            continue
+        for field_name in detail_config.get("fields", {}):
+            if field_name not in columns:
+                columns.append(field_name)
+    return columns
+
+
+def to_cell(value: Any) -> Any:
+    """将结果值转换为单元格值（与pandas导出Excel时的处理一致）"""
+    if value is None:
+        return None
+    if isinstance(value, (str, int, float, bool)):
+        if isinstance(value, str) and len(value) > EXCEL_CELL_LIMIT:
+            return value[:EXCEL_CELL_LIMIT]
+        return value
+    return str(value)
+
+
+class StreamingExporter:
+    """流式结果导出器
+
+    每批结果在独立的单线程执行器中追加写入文件（保证顺序且不阻塞事件循环）；
+    xlsx 使用 openpyxl 的 write-only 模式，行数据直接写入临时文件。
+    表头在第一次写入时确定：声明的列加上第一批结果中出现的其他字段，
+    之后的结果中不在表头内的字段不会导出（每个字段记录一次警告）。
+    关闭时可以替换已写入的结果行（需要重写整个文件，适合少量行在导出后又有变化的情况）。
+    """
+
+    def __init__(self, path: str, columns: List[str], preview_limit: int = 100):
+        self.path = path
+        self.format = os.path.splitext(path)[1].lower()
+        if self.format not in MEDIA_TYPES:
+            raise ValueError(f"不支持的导出格式: {self.format}")
+        self.columns = list(columns)
+        self.preview_limit = preview_limit
+        self.preview: List[Dict[str, Any]] = []
+        self.count = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bidscrap-export")
+        self._header_written = False
+        # 因不在表头内而未导出的字段
+        self._dropped_keys = set()
+        self._workbook = None
+        self._sheet = None
+        self._file = None
+        self._writer = None
+
+    async def append(self, rows: List[Dict[str, Any]]):
+        """追加一批结果"""
+        if not rows:
+            return
+        if len(self.preview) < self.preview_limit:
+            self.preview.extend(rows[:self.preview_limit - len(self.preview)])
+        self.count += len(rows)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._write_rows, rows)
+
+    async def close(self, updates: Optional[Dict[int, Dict[str, Any]]] = None) -> Optional[str]:
+        """完成写入，返回文件名；没有任何结果时不生成文件
+
+        Args:
+            updates: {行号: 结果项}，替换已写入的结果行（行号从0开始，按写入顺序）
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._finish, updates)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    def _write_rows(self, rows: List[Dict[str, Any]]):
+        if not self._header_written:
+            for row in rows:
+                for key in row:
+                    if key not in self.columns:
+                        self.columns.append(key)
+            self._open()
+
+        header = set(self.columns)
+        for row in rows:
+            dropped = [key for key in row if key not in header and key not in self._dropped_keys]
+            if dropped:
+                self._dropped_keys.update(dropped)
+                logger.warning(f"导出表头已确定，以下字段不在表头内，未导出: {', '.join(map(str, dropped))}")
+            record = self._format_row(row)
+            if self.format == ".xlsx":
+                self._sheet.append(record)
+            elif self.format == ".csv":
+                self._writer.writerow(record)
+            else:
+                self._file.write(record)
+
+    def _format_row(self, row: Dict[str, Any]) -> Any:
+        """结果项在导出文件中的内容：xlsx/CSV 为单元格列表，JSONL 为一行文本"""
+        values = [row.get(column) for column in self.columns]
+        if self.format == ".xlsx":
+            return [to_cell(value) for value in values]
+        if self.format == ".csv":
+            return ["" if value is None else value for value in values]
+        record = dict(zip(self.columns, values))
+        return json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+    def _open(self):
+        """创建输出文件并写入表头"""
+        if self.format == ".xlsx":
+            from openpyxl import Workbook
+            self._workbook = Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet()
+            self._sheet.append(self.columns)
+        elif self.format == ".csv":
+            # utf-8-sig 便于Excel直接打开中文CSV
+            self._file = open(self.path, "w", newline="", encoding="utf-8-sig")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.columns)
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._header_written = True
+
+    def _finish(self, updates: Optional[Dict[int, Dict[str, Any]]] = None) -> Optional[str]:
+        if not self._header_written:
+            return None
+        if self._workbook is not None:
+            self._workbook.save(self.path)
+        if self._file is not None:
+            self._file.close()
+        if updates:
+            self._rewrite(updates)
+        logger.info(f"已导出 {self.count} 条结果到 {self.path}")
+        return os.path.basename(self.path)
+
+    def _rewrite(self, updates: Dict[int, Dict[str, Any]]):
+        """替换已写入的结果行：逐行复制到临时文件，再替换原文件"""
+        root, ext = os.path.splitext(self.path)
+        temp_path = f"{root}.tmp{ext}"
+        if self.format == ".xlsx":
+            from openpyxl import Workbook, load_workbook
+            source = load_workbook(self.path, read_only=True)
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            # 第一行为表头
+            for index, values in enumerate(source.active.iter_rows(values_only=True), start=-1):
+                row = updates.get(index)
+                sheet.append(list(values) if row is None else self._format_row(row))
+            source.close()
+            workbook.save(temp_path)
+        elif self.format == ".csv":
+            with open(self.path, newline="", encoding="utf-8-sig") as source, \
+                    open(temp_path, "w", newline="", encoding="utf-8-sig") as target:
+                writer = csv.writer(target)
+                for index, values in enumerate(csv.reader(source), start=-1):
+                    row = updates.get(index)
+                    writer.writerow(values if row is None else self._format_row(row))
+        else:
+            with open(self.path, encoding="utf-8") as source, open(temp_path, "w", encoding="utf-8") as target:
+                for index, line in enumerate(source):
+                    row = updates.get(index)
+                    target.write(line if row is None else self._format_row(row))
+        os.replace(temp_path, self.path)
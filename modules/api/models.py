@@ -7,6 +7,16 @@ class CompanyPreviewResponse(BaseModel):
     success: bool
     companies: Optional[List[str]] = None
     count: Optional[int] = None
+    unique_count: Optional[int] = None  # 规范化合并不同写法后的企业数
+    error: Optional[str] = None
+
+class ArchiveSearchResponse(BaseModel):
+    """归档查询响应模型"""
+    success: bool
+    count: int = 0  # 符合条件的总数
+    results: List[Dict[str, Any]] = []
+    uncovered: Dict[str, List[List[str]]] = {}  # 各来源中归档尚未覆盖、需要实时抓取的日期窗口
+    elapsed_ms: Optional[float] = None
     error: Optional[str] = None
 
 class TenderItem(BaseModel):
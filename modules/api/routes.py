@@ -2,25 +2,33 @@
 import os
 import logging
 import asyncio
-import pandas as pd
 from fastapi import APIRouter, Request, UploadFile, File, Form, HTTPException
-from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from typing import List, Optional
 from datetime import datetime
 import uuid
 import json
+import time
 
 import config
 from modules import module_manager
-from modules.api.models import CompanyPreviewResponse
+from modules.metrics import registry, stage_timer, start_task_timings, summarize_task_timings
+from modules.api.export import MEDIA_TYPES, StreamingExporter, result_columns
+from modules.api.models import ArchiveSearchResponse, CompanyPreviewResponse
+from modules.api.scheduler import SearchScheduler
+from modules.api.task_store import create_task_store
+from modules.parsers.normalize import CompanyList
+from modules.scrapers.announcements import AnnouncementIndex
+from modules.scrapers.archive import get_archive, window_date
+from modules.scrapers.matcher import CompanyListMatcher
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 logger = logging.getLogger("bidscrap")
 
-# 全局进度存储
-search_progress = {}
+# 任务进度存储（带过期与数量上限）
+task_store = create_task_store()
 
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
@@ -73,7 +81,8 @@ async def preview_companies(
             return CompanyPreviewResponse(
                 success=True, 
                 companies=companies,
-                count=len(companies)
+                count=len(companies),
+                unique_count=len(CompanyList(companies))
             )
         except Exception as e:
             logger.error(f"解析文件失败: {str(e)}")
@@ -90,10 +99,12 @@ async def scrape_with_progress(request: Request):
     # 获取表单数据
     start_date = form.get('start_date', '').replace('-', ':')
     end_date = form.get('end_date', '').replace('-', ':')
-    source_type = form.get('source_type', 'default')
+    # 抓取模式：full 全量抓取；incremental 只抓取上次之后的新公告
+    incremental = form.get('mode', 'full') == 'incremental'
     
-    # 获取公司列表（与原scrape函数类似）
-    if source_type == 'default':
+    # 获取公司列表：页面添加或从文件导入的企业（companies[]）优先
+    selected_companies = [c for c in form.getlist('companies[]') if c and c.strip()]
+    if not selected_companies:
         company = form.get('company', '').strip()
         if company:
             selected_companies = [company]
@@ -101,168 +112,318 @@ async def scrape_with_progress(request: Request):
             selected_companies = form.getlist('default_companies')
             if not selected_companies:
                 selected_companies = config.TARGET_COMPANIES
-    else:
-        # ... 其余处理与原函数相同 ...
-        pass
         
     # 创建唯一任务ID
     task_id = str(uuid.uuid4())
     
     # 初始化进度信息
-    search_progress[task_id] = {
+    task_store.create(task_id, {
         "status": "started",
         "total_companies": len(selected_companies),
         "processed_companies": 0,
         "current_company": "",
         "results_count": 0,
+        "mode": "incremental" if incremental else "full",
         "log": []
-    }
+    })
     
     # 启动后台任务
     asyncio.create_task(
-        execute_search(task_id, selected_companies, start_date, end_date)
+        execute_search(task_id, selected_companies, start_date, end_date, incremental=incremental)
     )
     
     return {"task_id": task_id}
 
-async def execute_search(task_id, companies, start_date, end_date):
+async def execute_search(task_id, companies, start_date, end_date, incremental=False):
     """执行实际的搜索任务并更新进度"""
-    all_results = []
     searched_companies = []
     search_stats = {}
+    exporter = None
+    # 本任务各阶段耗时（任务内创建的协程会继承该上下文）
+    stage_timings = start_task_timings()
     
     try:
-        # 对每个公司执行搜索
-        for i, company in enumerate(companies):
-            # 更新进度
-            search_progress[task_id]["current_company"] = company
-            search_progress[task_id]["processed_companies"] = i
-            search_progress[task_id]["log"].append(f"开始搜索: {company}")
-            
+        scrapers = module_manager.scrapers
+        
+        # 结果在每个爬虫完成后流式写入导出文件，行顺序为各搜索任务的完成顺序（而非名单中的公司顺序）
+        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        output_file = os.path.join(config.OUTPUT_DIR, f"招投标信息_{timestamp}.{config.EXPORT_FORMAT}")
+        exporter = StreamingExporter(output_file, result_columns(scrapers.values()))
+        counters = {"processed_companies": 0, "results_count": 0, "current_company": ""}
+        
+        async def publish_progress():
+            await task_store.aupdate(task_id, **counters)
+            await task_store.aadd_event(task_id, "progress", dict(counters, status="running"))
+        
+        # 规范化名单：同一企业的不同写法合并为一次搜索，结果对应回全部原始写法
+        company_list = CompanyList(companies)
+        if company_list.merged:
+            await task_store.aappend_log(
+                task_id, f"名单规范化: {company_list.total} 个名称合并为 {len(company_list)} 家企业"
+            )
+        
+        # 每个公司的待完成爬虫数
+        remaining = {}
+        started = set()
+        for company in company_list:
             searched_companies.append(company)
-            search_stats[company] = {"total": 0, "sources": {}}
+            # mentioned: 其他公司的搜索结果中提到该公司的记录数；aliases: 名单中的原始写法
+            search_stats[company] = {
+                "total": 0, "sources": {}, "mentioned": 0, "aliases": company_list.spellings(company)
+            }
+            remaining[company] = len(scrapers)
+        counters["total_companies"] = len(searched_companies)
+        
+        async def on_job_start(company, scraper_name):
+            # 更新进度
+            counters["current_company"] = company
+            if company not in started:
+                started.add(company)
+                await task_store.aappend_log(task_id, f"开始搜索: {company}")
+            await publish_progress()
+        
+        # 整份名单共享的公告索引：同一公告只抓取一次详情，导出时只占一行
+        announcement_index = AnnouncementIndex(get_archive())
+        # 已导出的结果行；由其他公司负责补充详情、尚未导出的结果行
+        exported = set()
+        deferred = {}
+        # 按写入顺序记录已导出的 (结果行, 导出时"匹配公司"的数量)，用于最后补全"匹配公司"
+        written = []
+        
+        def take_new_rows(rows, company):
+            """返回本次应导出的结果行，其他公司首次搜到的公告在其搜索完成后导出"""
+            new_rows = []
+            for row in rows:
+                if id(row) in exported:
+                    continue
+                if announcement_index.owner(row) in (None, company):
+                    exported.add(id(row))
+                    deferred.pop(id(row), None)
+                    new_rows.append(row)
+                else:
+                    deferred[id(row)] = row
+            return new_rows
+        
+        async def export_rows(rows):
+            for row in rows:
+                row["名单写法"] = search_stats[row["公司名称"]]["aliases"]
+                written.append((row, len(row.get("匹配公司") or ())))
+            with stage_timer("export"):
+                await exporter.append(rows)
+            counters["results_count"] += len(rows)
+        
+        async def on_job_done(job):
+            company, scraper_name = job.company, job.scraper_name
+            stats = search_stats[company]
             
-            # 并行运行所有爬虫
-            tasks = []
-            for scraper_name, scraper in module_manager.scrapers.items():
-                # 添加爬虫的超时时间设置
-                scraper_timeout = getattr(scraper, "scraper_timeout", 60)  # 默认60秒
-                tasks.append((scraper_name, scraper.scrape(company, start_date, end_date)))
+            # 记录每个来源的结果数（包括其他公司也搜到的公告）
+            stats["sources"][scraper_name] = len(job.results)
+            stats["total"] += len(job.results)
+            await export_rows(take_new_rows(job.results, company))
             
-            # 等待所有爬虫完成
-            scraper_results = []
-            for scraper_name, task in tasks:
-                try:
-                    # 使用asyncio的wait_for添加超时控制
-                    scraper_timeout = getattr(module_manager.scrapers[scraper_name], 
-                                             "scraper_timeout", 60)  # 默认60秒
-                    results = await asyncio.wait_for(task, timeout=scraper_timeout)
-                    scraper_results.append(results)
-                    
-                    # 记录每个来源的结果数
-                    search_stats[company]["sources"][scraper_name] = len(results)
-                    search_stats[company]["total"] += len(results)
-                    search_progress[task_id]["log"].append(
-                        f"来源 {scraper_name} 找到 {len(results)} 条记录"
-                    )
-                except asyncio.TimeoutError:
-                    # 处理超时情况
-                    logger.error(f"搜索公司 {company} 的来源 {scraper_name} 超时")
-                    search_stats[company]["sources"][scraper_name] = 0
-                    search_progress[task_id]["log"].append(
-                        f"来源 {scraper_name} 搜索超时，已跳过"
-                    )
-                except Exception as e:
-                    logger.error(f"搜索公司 {company} 的来源 {scraper_name} 失败: {str(e)}")
-                    search_stats[company]["sources"][scraper_name] = 0
-                    search_progress[task_id]["log"].append(
-                        f"来源 {scraper_name} 搜索失败: {str(e)}"
-                    )
+            await task_store.aadd_event(task_id, "source", {
+                "company": company,
+                "source": scraper_name,
+                "count": len(job.results),
+                "status": "timeout" if job.timed_out else ("error" if job.error is not None else "ok")
+            })
+            if job.timed_out:
+                await task_store.aappend_log(task_id, f"来源 {scraper_name} 搜索超时，已跳过")
+            elif job.error is not None:
+                await task_store.aappend_log(task_id, f"来源 {scraper_name} 搜索失败: {job.error}")
+            else:
+                await task_store.aappend_log(task_id, f"来源 {scraper_name} 找到 {len(job.results)} 条记录")
             
-            # 合并结果
-            for results in scraper_results:
-                all_results.extend(results)
-                
-            # 更新进度
-            search_progress[task_id]["results_count"] = len(all_results)
-            search_progress[task_id]["log"].append(
-                f"完成搜索: {company}, 共找到 {search_stats[company]['total']} 条记录"
-            )
+            remaining[company] -= 1
+            if remaining[company] == 0:
+                counters["processed_companies"] += 1
+                await task_store.aappend_log(
+                    task_id, f"完成搜索: {company}, 共找到 {stats['total']} 条记录"
+                )
+            await publish_progress()
         
-        # 保存结果到Excel
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        output_file = os.path.join(config.OUTPUT_DIR, f"招投标信息_{timestamp}.xlsx")
+        # 整份名单只构建一次多模式匹配器，每条公告一次扫描即可找出提到的所有名单企业
+        company_index = CompanyListMatcher(searched_companies)
         
-        if all_results:
-            df = pd.DataFrame(all_results)
-            df.to_excel(output_file, index=False)
-            filename = os.path.basename(output_file)
-        else:
-            filename = None
-            
+        # 并发执行所有 (公司, 爬虫) 搜索任务
+        scheduler = SearchScheduler(scrapers)
+        await scheduler.run(
+            searched_companies, start_date, end_date,
+            on_job_start=on_job_start,
+            on_job_done=on_job_done,
+            incremental=incremental,
+            company_index=company_index,
+            announcement_index=announcement_index
+        )
+        
+        # 首次搜到公告的一方搜索失败时，由其他公司搜到的结果行在最后导出
+        if deferred:
+            exported.update(deferred)
+            await export_rows(list(deferred.values()))
+            deferred.clear()
+        
+        # 导出后又被其他公司搜到的公告，在关闭导出文件时补全"匹配公司"；
+        # 被提到次数只统计没有自己搜到该公告的公司
+        updates = {}
+        for position, (row, matched_count) in enumerate(written):
+            matched = row.get("匹配公司") or []
+            if len(matched) != matched_count:
+                updates[position] = row
+            finders = announcement_index.finders(row)
+            for other in matched[1:]:
+                if other in search_stats and other not in finders:
+                    search_stats[other]["mentioned"] += 1
+        if announcement_index.duplicates:
+            await task_store.aappend_log(
+                task_id, f"公告去重: 多家企业重复搜到的 {announcement_index.duplicates} 条结果已合并，"
+                         f"共 {len(announcement_index)} 条公告"
+            )
+        
+        # 完成导出文件（没有结果时不生成文件）
+        with stage_timer("export"):
+            filename = await exporter.close(updates)
         # 更新最终状态
-        search_progress[task_id].update({
-            "status": "completed",
-            "processed_companies": len(companies),
-            "success": len(all_results) > 0,
+        await task_store.aupdate(
+            task_id,
+            status="completed",
+            processed_companies=len(searched_companies),
+            success=exporter.count > 0,
+            filename=filename,
+            search_stats=search_stats,
+            stage_timings=summarize_task_timings(stage_timings),
+            searched_companies=searched_companies,
+            results=exporter.preview,  # 只保留前100条用于页面展示
+            count=exporter.count
+        )
+        await task_store.aadd_event(task_id, "completed", {
+            "success": exporter.count > 0,
             "filename": filename,
-            "search_stats": search_stats,
-            "searched_companies": searched_companies,
-            "results": all_results if len(all_results) < 100 else all_results[:100],  # 限制大小
-            "count": len(all_results)
+            "count": exporter.count
         })
             
     except Exception as e:
-        # 处理错误
-        search_progress[task_id].update({
-            "status": "error",
-            "error": str(e),
-            "log": search_progress[task_id]["log"] + [f"错误: {str(e)}"]
-        })
+        # 处理错误（保留已写入的部分结果并释放导出线程）
+        if exporter is not None:
+            try:
+                await exporter.close()
+            except Exception as close_error:
+                logger.error(f"关闭导出文件失败: {str(close_error)}")
+        await task_store.aappend_log(task_id, f"错误: {str(e)}")
+        await task_store.aupdate(
+            task_id, status="error", error=str(e), stage_timings=summarize_task_timings(stage_timings)
+        )
+        await task_store.aadd_event(task_id, "failed", {"error": str(e)})
 
 @router.get("/search_progress/{task_id}")
 async def get_search_progress(task_id: str):
     """获取搜索进度"""
-    if task_id not in search_progress:
+    progress = task_store.get(task_id)
+    if progress is None:
         raise HTTPException(status_code=404, detail="任务ID不存在")
     
-    return search_progress[task_id]
+    return progress
 
 @router.get("/search_progress_stream/{task_id}")
-async def search_progress_stream(task_id: str):
-    """Server-Sent Events流式更新进度"""
-    if task_id not in search_progress:
+async def search_progress_stream(request: Request, task_id: str):
+    """Server-Sent Events流式推送进度
+    
+    只推送增量事件（progress、log、source、completed、failed），
+    断线重连时根据 Last-Event-ID 从断点继续。
+    """
+    state = task_store.get(task_id)
+    if state is None:
         raise HTTPException(status_code=404, detail="任务ID不存在")
     
+    try:
+        last_event_id = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        last_event_id = 0
+    
     async def event_generator():
-        last_status = None
+        nonlocal last_event_id
+        yield "retry: 3000\n\n"
+        
+        # 首次连接先发送当前计数快照
+        if last_event_id == 0:
+            snapshot = {key: state.get(key) for key in
+                        ("status", "total_companies", "processed_companies", "current_company", "results_count")}
+            yield f"event: progress\ndata: {json.dumps(snapshot, ensure_ascii=False)}\n\n"
+        
         while True:
-            current = search_progress[task_id]
-            
-            # 只有状态变化时才发送
-            if current != last_status:
-                yield f"data: {json.dumps(current, ensure_ascii=False)}\n\n"
-                last_status = current.copy()
+            events = task_store.get_events(task_id, last_event_id)
+            for event_id, event, data in events:
+                last_event_id = event_id
+                yield f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+                # 任务结束后关闭流
+                if event in ("completed", "failed"):
+                    return
             
-            # 如果已完成或出错，结束流
-            if current.get("status") in ["completed", "error"]:
-                break
-                
-            await asyncio.sleep(0.5)
+            if not events:
+                if task_id not in task_store:
+                    return
+                if not await task_store.wait_for_events(task_id, config.SSE_KEEPALIVE_INTERVAL):
+                    # 保持连接的注释行
+                    yield ": keepalive\n\n"
     
     return StreamingResponse(
         event_generator(),
-        media_type="text/event-stream"
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/archive/search", response_model=ArchiveSearchResponse)
+async def search_archive(company: Optional[str] = None, keyword: Optional[str] = None,
+                         start_date: Optional[str] = None, end_date: Optional[str] = None,
+                         source: Optional[str] = None, limit: int = 100, offset: int = 0):
+    """从公告归档查询（不访问网络）
+    
+    按企业、关键词、发布日期范围与来源筛选，结果按发布日期倒序；
+    指定企业与日期范围时同时返回各来源中归档尚未覆盖、需要实时抓取的日期窗口。
+    """
+    archive = get_archive()
+    if archive is None:
+        raise HTTPException(status_code=404, detail="未启用公告归档")
+    
+    start, end = window_date(start_date), window_date(end_date)
+    if (start_date and not start) or (end_date and not end):
+        raise HTTPException(status_code=400, detail="日期格式错误，应为 YYYY-MM-DD")
+    limit = min(max(limit, 1), config.ARCHIVE_QUERY_LIMIT)
+    
+    started = time.perf_counter()
+    try:
+        with stage_timer("archive_query"):
+            count, results = await archive.aquery(
+                company=company, keyword=keyword, start=start, end=end,
+                source=source, limit=limit, offset=max(offset, 0)
+            )
+        uncovered = {}
+        if company and start and end:
+            for name in ([source] if source else module_manager.scrapers):
+                uncovered[name] = await archive.agaps(name, company, start, end)
+    except Exception as e:
+        logger.error(f"查询公告归档出错: {str(e)}")
+        return ArchiveSearchResponse(success=False, error=f"查询归档失败: {str(e)}")
+    
+    return ArchiveSearchResponse(
+        success=True,
+        count=count,
+        results=results,
+        uncovered=uncovered,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2)
     )
 
+@router.get("/metrics")
+async def metrics():
+    """Prometheus格式的运行指标"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @router.get("/search_results/{task_id}")
 async def get_search_results(request: Request, task_id: str):
     """显示搜索结果页面"""
-    if task_id not in search_progress:
+    progress = task_store.get(task_id)
+    if progress is None:
         raise HTTPException(status_code=404, detail="任务ID不存在")
     
-    progress = search_progress[task_id]
-    
     if progress.get("status") != "completed":
         return templates.TemplateResponse(
             "results.html",
@@ -298,13 +459,13 @@ async def get_search_results(request: Request, task_id: str):
 
 @router.get("/download/{filename}")
 async def download(filename: str):
-    """下载Excel文件"""
+    """下载导出文件"""
     file_path = os.path.join(config.OUTPUT_DIR, filename)
     if os.path.exists(file_path):
         return FileResponse(
             path=file_path, 
             filename=filename, 
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            media_type=MEDIA_TYPES.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
         )
     else:
         raise HTTPException(status_code=404, detail="文件不存在") 
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""搜索任务调度器 - 以受限并发执行 (公司, 爬虫) 搜索任务"""
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import config
+from modules.metrics import TIMEOUTS, stage_timer
+
+logger = logging.getLogger("bidscrap")
+
+# 进程级并发控制：全局上限与每个爬虫的上限（延迟创建）
+_global_semaphore: Optional[asyncio.Semaphore] = None
+_scraper_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_global_semaphore() -> asyncio.Semaphore:
+    """获取全局并发信号量"""
+    global _global_semaphore
+    if _global_semaphore is None:
+        _global_semaphore = asyncio.Semaphore(config.SEARCH_CONCURRENCY)
+    return _global_semaphore
+
+
+def get_scraper_semaphore(scraper_name: str, scraper) -> asyncio.Semaphore:
+    """获取指定爬虫的并发信号量"""
+    if scraper_name not in _scraper_semaphores:
+        limit = getattr(scraper, "max_concurrency", config.SCRAPER_CONCURRENCY)
+        _scraper_semaphores[scraper_name] = asyncio.Semaphore(limit)
+    return _scraper_semaphores[scraper_name]
+
+
+class SearchJob:
+    """单个 (公司, 爬虫) 搜索任务的执行结果"""
+
+    def __init__(self, company: str, scraper_name: str):
+        self.company = company
+        self.scraper_name = scraper_name
+        self.results: List[Dict[str, Any]] = []
+        self.timed_out = False
+        self.error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.timed_out and self.error is None
+
+
+class SearchScheduler:
+    """并发执行多公司、多爬虫的搜索任务
+
+    所有任务共享进程级的全局并发上限，同时每个爬虫受自身的
+    max_concurrency 限制；每个任务保留爬虫自己的 scraper_timeout。
+    """
+
+    def __init__(self, scrapers: Dict[str, Any]):
+        self.scrapers = scrapers
+
+    def iter_jobs(self, companies: List[str]) -> Iterator[Tuple[str, str]]:
+        """按公司顺序生成 (公司, 爬虫名称) 任务"""
+        for company in companies:
+            for scraper_name in self.scrapers:
+                yield company, scraper_name
+
+    async def run(self, companies: List[str], start_date: str, end_date: str,
+                  on_job_start: Callable[[str, str], Any] = None,
+                  on_job_done: Callable[[SearchJob], Any] = None,
+                  **scrape_kwargs):
+        """执行所有搜索任务，每个任务开始时回调 on_job_start、完成时回调 on_job_done（均可以是协程函数）"""
+        # 限制同时挂起的任务数量，避免超大名单一次性创建过多协程
+        max_pending = max(config.SEARCH_CONCURRENCY * 4, 1)
+        pending = set()
+
+        try:
+            for company, scraper_name in self.iter_jobs(companies):
+                if len(pending) >= max_pending:
+                    pending = await self._drain(pending, on_job_done)
+                pending.add(asyncio.create_task(self._run_job(
+                    company, scraper_name, start_date, end_date, on_job_start, **scrape_kwargs
+                )))
+
+            while pending:
+                pending = await self._drain(pending, on_job_done)
+        finally:
+            # 回调出错或被取消时取消其余任务，避免任务结束后仍在后台请求与回调
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _drain(self, pending: set, on_job_done) -> set:
+        """等待至少一个任务完成并回调"""
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            job = task.result()
+            if on_job_done:
+                outcome = on_job_done(job)
+                if inspect.isawaitable(outcome):
+                    await outcome
+        return pending
+
+    async def _run_job(self, company: str, scraper_name: str, start_date: str, end_date: str,
+                       on_job_start=None, **scrape_kwargs) -> SearchJob:
+        """在并发限制内执行单个搜索任务"""
+        scraper = self.scrapers[scraper_name]
+        job = SearchJob(company, scraper_name)
+        scraper_timeout = getattr(scraper, "scraper_timeout", 60)  # 默认60秒
+
+        async with get_global_semaphore(), get_scraper_semaphore(scraper_name, scraper):
+            if on_job_start:
+                outcome = on_job_start(company, scraper_name)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            try:
+                # 超时只计算实际执行时间，不包含排队等待
+                with stage_timer("search_job", scraper_name):
+                    job.results = await asyncio.wait_for(
+                        scraper.scrape(company, start_date, end_date, **scrape_kwargs),
+                        timeout=scraper_timeout
+                    )
+            except asyncio.TimeoutError:
+                logger.error(f"搜索公司 {company} 的来源 {scraper_name} 超时")
+                TIMEOUTS.inc(scraper=scraper_name, scope="job")
+                job.timed_out = True
+            except Exception as e:
+                logger.error(f"搜索公司 {company} 的来源 {scraper_name} 失败: {str(e)}")
+                job.error = str(e)
+
+        return job
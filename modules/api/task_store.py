@@ -0,0 +1,351 @@
+"""任务状态存储 - 保存搜索任务的进度与事件，支持过期、LRU淘汰与数量上限
+
+每个任务除状态字段外还有一条递增编号的事件流（日志、计数、来源结果等），
+SSE 推送只发送新事件，并可根据 Last-Event-ID 从断点继续。
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+
+logger = logging.getLogger("bidscrap")
+
+# 已结束的任务状态，淘汰时优先清理
+FINISHED_STATUSES = ("completed", "error")
+
+# 事件：(事件编号, 事件类型, 事件数据)
+TaskEvent = Tuple[int, str, Dict[str, Any]]
+
+
+class TaskStore(ABC):
+    """任务存储抽象基类"""
+
+    # 跨进程共享的存储无法收到其他进程的通知，等待事件时需定期轮询（秒）
+    poll_interval: Optional[float] = None
+
+    def __init__(self, max_tasks: int, ttl: float, max_events: int):
+        self.max_tasks = max_tasks
+        self.ttl = ttl
+        self.max_events = max_events
+        self._waiters: Dict[str, asyncio.Event] = {}
+
+    @abstractmethod
+    def create(self, task_id: str, state: Dict[str, Any]):
+        """创建任务"""
+        pass
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务状态（log 字段为保留的日志），不存在时返回None"""
+        pass
+
+    @abstractmethod
+    def update(self, task_id: str, **fields):
+        """更新任务状态字段"""
+        pass
+
+    @abstractmethod
+    def _store_event(self, task_id: str, event: str, data: Dict[str, Any]) -> Optional[int]:
+        """保存事件并返回事件编号"""
+        pass
+
+    @abstractmethod
+    def get_events(self, task_id: str, after_id: int = 0) -> List[TaskEvent]:
+        """获取编号大于 after_id 的事件"""
+        pass
+
+    def add_event(self, task_id: str, event: str, data: Dict[str, Any]) -> Optional[int]:
+        """追加事件并唤醒等待该任务的订阅者"""
+        event_id = self._store_event(task_id, event, data)
+        self._notify(task_id)
+        return event_id
+
+    def append_log(self, task_id: str, message: str):
+        """追加一条任务日志"""
+        self.add_event(task_id, "log", {"message": message})
+
+    def _notify(self, task_id: str):
+        """唤醒等待该任务事件的订阅者（需在事件循环线程中调用）"""
+        waiter = self._waiters.pop(task_id, None)
+        if waiter is not None:
+            waiter.set()
+
+    # 异步版本供搜索任务在事件循环中调用；需要磁盘IO的存储在线程中执行写入
+    async def aupdate(self, task_id: str, **fields):
+        self.update(task_id, **fields)
+
+    async def _astore_event(self, task_id: str, event: str, data: Dict[str, Any]) -> Optional[int]:
+        return self._store_event(task_id, event, data)
+
+    async def aadd_event(self, task_id: str, event: str, data: Dict[str, Any]) -> Optional[int]:
+        event_id = await self._astore_event(task_id, event, data)
+        self._notify(task_id)
+        return event_id
+
+    async def aappend_log(self, task_id: str, message: str):
+        await self.aadd_event(task_id, "log", {"message": message})
+
+    async def wait_for_events(self, task_id: str, timeout: float) -> bool:
+        """等待任务产生新事件，超时返回False"""
+        if self.poll_interval:
+            timeout = min(timeout, self.poll_interval)
+        waiter = self._waiters.get(task_id)
+        if waiter is None:
+            waiter = self._waiters[task_id] = asyncio.Event()
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+    def close(self):
+        """释放存储资源"""
+        pass
+
+
+class MemoryTaskStore(TaskStore):
+    """内存任务存储 - 单进程使用"""
+
+    def __init__(self, max_tasks: int, ttl: float, max_events: int):
+        super().__init__(max_tasks, ttl, max_events)
+        # task_id -> 任务记录，按最近访问排序
+        self._tasks: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def create(self, task_id: str, state: Dict[str, Any]):
+        state = dict(state)
+        logs = state.pop("log", [])
+        self._tasks[task_id] = {
+            "state": state,
+            "events": deque(maxlen=self.max_events),
+            "next_id": 1,
+            "updated": time.time(),
+        }
+        for message in logs:
+            self.append_log(task_id, message)
+        self._evict()
+
+    def _get_entry(self, task_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return None
+        if time.time() - entry["updated"] > self.ttl:
+            del self._tasks[task_id]
+            return None
+        self._tasks.move_to_end(task_id)
+        return entry
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._get_entry(task_id)
+        if entry is None:
+            return None
+        state = dict(entry["state"])
+        state["log"] = [data["message"] for _, event, data in entry["events"] if event == "log"]
+        return state
+
+    def update(self, task_id: str, **fields):
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return
+        fields.pop("log", None)
+        entry["state"].update(fields)
+        entry["updated"] = time.time()
+        self._tasks.move_to_end(task_id)
+
+    def _store_event(self, task_id: str, event: str, data: Dict[str, Any]) -> Optional[int]:
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return None
+        event_id = entry["next_id"]
+        entry["next_id"] += 1
+        entry["events"].append((event_id, event, data))
+        entry["updated"] = time.time()
+        return event_id
+
+    def get_events(self, task_id: str, after_id: int = 0) -> List[TaskEvent]:
+        entry = self._get_entry(task_id)
+        if entry is None:
+            return []
+        events = entry["events"]
+        # 事件编号连续递增，可直接定位起始位置
+        if not events or events[-1][0] <= after_id:
+            return []
+        start = max(after_id - events[0][0] + 1, 0)
+        return [events[i] for i in range(start, len(events))]
+
+    def _evict(self):
+        """清理过期任务，超出数量上限时按LRU淘汰（优先淘汰已结束的任务）"""
+        now = time.time()
+        for task_id in [tid for tid, entry in self._tasks.items() if now - entry["updated"] > self.ttl]:
+            del self._tasks[task_id]
+
+        if len(self._tasks) <= self.max_tasks:
+            return
+        for finished_only in (True, False):
+            for task_id in list(self._tasks):
+                if len(self._tasks) <= self.max_tasks:
+                    return
+                if finished_only and self._tasks[task_id]["state"].get("status") not in FINISHED_STATUSES:
+                    continue
+                del self._tasks[task_id]
+                logger.info(f"任务存储已满，淘汰任务: {task_id}")
+
+
+class SQLiteTaskStore(TaskStore):
+    """SQLite任务存储 - 任务状态在重启后保留，并可在多个worker进程间共享"""
+
+    poll_interval = 1.0
+
+    def __init__(self, path: str, max_tasks: int, ttl: float, max_events: int):
+        super().__init__(max_tasks, ttl, max_events)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                status TEXT,
+                updated REAL NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_accessed ON tasks(accessed);
+            CREATE TABLE IF NOT EXISTS task_events (
+                task_id TEXT NOT NULL,
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                event TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_task_events_task ON task_events(task_id, seq);
+        """)
+        self._conn.commit()
+
+    def create(self, task_id: str, state: Dict[str, Any]):
+        state = dict(state)
+        logs = state.pop("log", [])
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tasks (task_id, state, status, updated, accessed) VALUES (?, ?, ?, ?, ?)",
+                (task_id, json.dumps(state, ensure_ascii=False), state.get("status"), now, now)
+            )
+            self._conn.execute("DELETE FROM task_events WHERE task_id = ?", (task_id,))
+            self._evict(now)
+            self._conn.commit()
+        for message in logs:
+            self.append_log(task_id, message)
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, updated FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                return None
+            self._conn.execute("UPDATE tasks SET accessed = ? WHERE task_id = ?", (now, task_id))
+            self._conn.commit()
+            logs = self._conn.execute(
+                "SELECT data FROM task_events WHERE task_id = ? AND event = 'log' ORDER BY seq", (task_id,)
+            ).fetchall()
+
+        state = json.loads(row[0])
+        state["log"] = [json.loads(data)["message"] for (data,) in logs]
+        return state
+
+    def update(self, task_id: str, **fields):
+        fields.pop("log", None)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                return
+            state = json.loads(row[0])
+            state.update(fields)
+            self._conn.execute(
+                "UPDATE tasks SET state = ?, status = ?, updated = ?, accessed = ? WHERE task_id = ?",
+                (json.dumps(state, ensure_ascii=False), state.get("status"), now, now, task_id)
+            )
+            self._conn.commit()
+
+    def _store_event(self, task_id: str, event: str, data: Dict[str, Any]) -> Optional[int]:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO task_events (task_id, event, data) VALUES (?, ?, ?)",
+                (task_id, event, json.dumps(data, ensure_ascii=False))
+            )
+            event_id = cursor.lastrowid
+            self._conn.execute("UPDATE tasks SET updated = ? WHERE task_id = ?", (time.time(), task_id))
+            # 定期裁剪超出保留数量的旧事件
+            if event_id % 100 == 0:
+                self._conn.execute("""
+                    DELETE FROM task_events WHERE task_id = ? AND seq <= (
+                        SELECT seq FROM task_events WHERE task_id = ?
+                        ORDER BY seq DESC LIMIT 1 OFFSET ?
+                    )
+                """, (task_id, task_id, self.max_events))
+            self._conn.commit()
+        return event_id
+
+    async def aupdate(self, task_id: str, **fields):
+        await asyncio.to_thread(self.update, task_id, **fields)
+
+    async def _astore_event(self, task_id: str, event: str, data: Dict[str, Any]) -> Optional[int]:
+        return await asyncio.to_thread(self._store_event, task_id, event, data)
+
+    def get_events(self, task_id: str, after_id: int = 0) -> List[TaskEvent]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, event, data FROM task_events WHERE task_id = ? AND seq > ? ORDER BY seq",
+                (task_id, after_id)
+            ).fetchall()
+        return [(seq, event, json.loads(data)) for seq, event, data in rows]
+
+    def _evict(self, now: float):
+        """清理过期任务，超出数量上限时按LRU淘汰（调用方需持有锁）"""
+        self._conn.execute("DELETE FROM tasks WHERE updated < ?", (now - self.ttl,))
+
+        count = self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        overflow = count - self.max_tasks
+        if overflow > 0:
+            # 已结束的任务排在前面，其次按最近访问时间
+            self._conn.execute("""
+                DELETE FROM tasks WHERE task_id IN (
+                    SELECT task_id FROM tasks
+                    ORDER BY status IN ('completed', 'error') DESC, accessed
+                    LIMIT ?
+                )
+            """, (overflow,))
+        self._conn.execute("DELETE FROM task_events WHERE task_id NOT IN (SELECT task_id FROM tasks)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_task_store() -> TaskStore:
+    """根据配置创建任务存储"""
+    if config.TASK_STORE_BACKEND == "sqlite":
+        return SQLiteTaskStore(
+            os.path.join(config.OUTPUT_DIR, "state", "tasks.sqlite3"),
+            max_tasks=config.TASK_STORE_MAX_TASKS,
+            ttl=config.TASK_STORE_TTL,
+            max_events=config.TASK_STORE_MAX_EVENTS
+        )
+    return MemoryTaskStore(
+        max_tasks=config.TASK_STORE_MAX_TASKS,
+        ttl=config.TASK_STORE_TTL,
+        max_events=config.TASK_STORE_MAX_EVENTS
+    )
@@ -0,0 +1,194 @@
+"""运行指标 - 进程内的计数器与耗时直方图，按Prometheus文本格式输出
+
+各阶段耗时同时累加到当前搜索任务的阶段统计中（通过 contextvar 传递，
+任务内创建的协程与 asyncio.to_thread 线程都会继承）。
+在解析进程池子进程中执行的代码不会计入本进程的指标。
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 直方图默认分桶（秒）
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 当前搜索任务的阶段耗时：阶段 -> {"count": 次数, "seconds": 累计秒数}
+_task_stage_timings: ContextVar[Optional[Dict[str, Dict[str, float]]]] = ContextVar(
+    "bidscrap_task_stage_timings", default=None
+)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """单调递增计数器"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """耗时直方图（累计分桶）"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 标签值 -> [各分桶计数..., 总次数, 总和]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += 1
+            state[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                labels = _format_labels(self.labelnames, key, f'le="{bound:g}"')
+                lines.append(f"{self.name}_bucket{labels} {count:g}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {state[-2]:g}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-2]:g}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-1]:.6f}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "bidscrap_stage_seconds", "各处理阶段的耗时(秒)", ("stage", "scraper")
+)
+REQUESTS = registry.counter(
+    "bidscrap_requests_total", "发出的HTTP请求数", ("scraper", "kind", "status")
+)
+RESPONSE_BYTES = registry.counter(
+    "bidscrap_response_bytes_total", "收到的响应正文字符数", ("scraper", "kind")
+)
+CACHE_HITS = registry.counter(
+    "bidscrap_cache_hits_total", "响应缓存命中次数", ("scraper", "kind")
+)
+RETRIES = registry.counter(
+    "bidscrap_retries_total", "请求重试次数", ("scraper", "reason")
+)
+TIMEOUTS = registry.counter(
+    "bidscrap_timeouts_total", "超时次数（请求或整个搜索任务）", ("scraper", "scope")
+)
+
+
+class StageTimer:
+    """记录一个阶段的耗时：写入直方图并累加到当前任务的阶段统计"""
+
+    __slots__ = ("stage", "scraper", "start")
+
+    def __init__(self, stage: str, scraper: str = ""):
+        self.stage = stage
+        self.scraper = scraper
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe_stage(self.stage, time.perf_counter() - self.start, self.scraper)
+        return False
+
+
+def stage_timer(stage: str, scraper: str = "") -> StageTimer:
+    """阶段计时上下文管理器"""
+    return StageTimer(stage, scraper)
+
+
+def observe_stage(stage: str, seconds: float, scraper: str = ""):
+    """记录阶段耗时"""
+    STAGE_SECONDS.observe(seconds, stage=stage, scraper=scraper)
+    timings = _task_stage_timings.get()
+    if timings is not None:
+        entry = timings.get(stage)
+        if entry is None:
+            entry = timings[stage] = {"count": 0, "seconds": 0.0}
+        entry["count"] += 1
+        entry["seconds"] += seconds
+
+
+def start_task_timings() -> Dict[str, Dict[str, float]]:
+    """在当前上下文开始收集任务的阶段耗时，返回收集用的字典"""
+    timings: Dict[str, Dict[str, float]] = {}
+    _task_stage_timings.set(timings)
+    return timings
+
+
+def summarize_task_timings(timings: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """整理任务阶段耗时（次数、累计秒数、平均毫秒数），便于保存与展示"""
+    return {
+        stage: {
+            "count": entry["count"],
+            "seconds": round(entry["seconds"], 3),
+            "avg_ms": round(entry["seconds"] / entry["count"] * 1000, 3) if entry["count"] else 0.0,
+        }
+        for stage, entry in sorted(timings.items())
+    }
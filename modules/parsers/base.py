@@ -1,22 +1,63 @@
 """文件解析器基础类 - 定义所有文件解析器必须实现的接口"""
+import asyncio
+import io
 from abc import ABC, abstractmethod
-from typing import List, Any
+from typing import BinaryIO, Iterable, List, Any
 
 class FileParser(ABC):
     """文件解析器抽象基类"""
     
     @classmethod
-    @abstractmethod
     async def parse(cls, file, column_index: int = 0, skip_rows: int = 1) -> List[str]:
         """
         解析文件提取企业名称
-        :param file: 上传的文件对象
+        
+        直接读取上传文件的底层流（不整体读入内存、不写临时文件），
+        解析在工作线程中执行，不阻塞事件循环。
+        :param file: 上传的文件对象（UploadFile）、二进制文件对象或bytes
+        :param column_index: 企业名称所在的列索引 (从0开始)
+        :param skip_rows: 要跳过的行数
+        :return: 企业名称列表
+        """
+        stream = cls.open_stream(file)
+        filename = getattr(file, "filename", None) or ""
+        return await asyncio.to_thread(cls.parse_stream, stream, column_index, skip_rows, filename)
+    
+    @classmethod
+    @abstractmethod
+    def parse_stream(cls, stream: BinaryIO, column_index: int = 0, skip_rows: int = 1,
+                     filename: str = "") -> List[str]:
+        """
+        从二进制流解析企业名称（同步执行，由 parse 放入工作线程）
+        :param stream: 已定位到开头的二进制文件对象
         :param column_index: 企业名称所在的列索引 (从0开始)
         :param skip_rows: 要跳过的行数
+        :param filename: 原始文件名，用于区分同一解析器处理的不同格式
         :return: 企业名称列表
         """
         pass
     
+    @staticmethod
+    def open_stream(file) -> BinaryIO:
+        """获取上传文件的二进制流：UploadFile 使用其底层文件对象，bytes 包装为 BytesIO"""
+        if isinstance(file, (bytes, bytearray)):
+            return io.BytesIO(file)
+        stream = getattr(file, "file", file)
+        stream.seek(0)
+        return stream
+    
+    @staticmethod
+    def clean_names(values: Iterable[Any]) -> List[str]:
+        """清理企业名称：转为字符串、去除首尾空白并丢弃空值"""
+        names = []
+        for value in values:
+            if value is None or value != value:  # None 或 NaN
+                continue
+            name = str(value).strip()
+            if name:
+                names.append(name)
+        return names
+    
     @classmethod
     @abstractmethod
     def can_handle(cls, file_extension: str) -> bool:
@@ -32,4 +73,4 @@ class FileParser(ABC):
     @abstractmethod
     def name(cls) -> str:
         """解析器名称"""
-        pass 
\ No newline at end of file
+        pass
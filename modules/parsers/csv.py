@@ -1,55 +1,103 @@
 """CSV文件解析器 - 处理.csv文件"""
-import os
-import tempfile
+import codecs
+import csv
 import logging
 import pandas as pd
-from typing import List
+from typing import Iterator, List, Tuple
 
 from modules.parsers.base import FileParser
 from modules.parsers import register_parser
 
 logger = logging.getLogger("bidscrap")
 
+# 用于探测编码与分隔符的文件开头字节数
+SNIFF_BYTES = 64 * 1024
+# 候选分隔符
+DELIMITERS = ",\t;|"
+# 分块读取的行数
+CHUNK_ROWS = 100000
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """根据文件开头判断编码：带BOM的UTF-8/UTF-16，能按UTF-8解码则为UTF-8，否则按GB18030（兼容GBK）"""
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        # 开头片段可能截断在多字节字符中间，使用增量解码器忽略末尾的不完整字符
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "gb18030"
+
+
+def sniff_delimiter(sample: str, skip_rows: int = 0) -> str:
+    """根据文件开头（跳过标题等说明行）判断分隔符，无法判断（如只有一列）时使用逗号"""
+    # 去掉可能不完整的最后一行
+    lines = sample.splitlines()
+    lines = (lines[:-1] if len(lines) > 1 else lines)[skip_rows:]
+    if not lines:
+        return ","
+    try:
+        return csv.Sniffer().sniff("\n".join(lines), delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        pass
+    # 样本不足以判断时，取表头行中出现最多的候选分隔符
+    counts = {delimiter: lines[0].count(delimiter) for delimiter in DELIMITERS}
+    delimiter = max(counts, key=counts.get)
+    return delimiter if counts[delimiter] else ","
+
+
 @register_parser
 class CSVParser(FileParser):
-    """CSV文件解析器"""
+    """CSV文件解析器 - 自动识别编码（UTF-8、GBK/GB18030）与分隔符"""
     
     @classmethod
-    async def parse(cls, file, column_index: int = 0, skip_rows: int = 1) -> List[str]:
-        """解析CSV文件提取企业名称"""
-        companies = []
-        
-        # 创建临时文件
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.csv')
-        
+    def parse_stream(cls, stream, column_index: int = 0, skip_rows: int = 1,
+                     filename: str = "") -> List[str]:
+        """解析CSV文件提取企业名称（去重并保持首次出现的顺序）"""
         try:
-            # 读取上传的文件内容
-            content = await file.read()
-            
-            # 写入临时文件
-            with open(temp_file.name, "wb") as f:
-                f.write(content)
-            
-            # 使用pandas读取CSV文件
-            df = pd.read_csv(temp_file.name, skiprows=skip_rows)
-            
-            # 提取指定列的企业名称
-            if column_index < len(df.columns):
-                companies = df.iloc[:, column_index].dropna().tolist()
-                # 清理公司名称
-                companies = [str(company).strip() for company in companies if str(company).strip()]
-            else:
-                raise ValueError(f"列索引 {column_index} 超出范围，文件只有 {len(df.columns)} 列")
-                
+            return list(cls.iter_companies(stream, column_index, skip_rows))
         except Exception as e:
             logger.error(f"解析CSV文件时出错: {str(e)}")
             raise e
-        finally:
-            # 删除临时文件
-            if os.path.exists(temp_file.name):
-                os.unlink(temp_file.name)
+    
+    @classmethod
+    def sniff(cls, stream, skip_rows: int = 0) -> Tuple[str, str]:
+        """探测编码与分隔符，返回 (encoding, delimiter)，探测后流回到开头"""
+        prefix = stream.read(SNIFF_BYTES)
+        stream.seek(0)
+        encoding = sniff_encoding(prefix)
+        delimiter = sniff_delimiter(prefix.decode(encoding, errors="ignore"), skip_rows)
+        return encoding, delimiter
+    
+    @classmethod
+    def iter_companies(cls, stream, column_index: int = 0, skip_rows: int = 1) -> Iterator[str]:
+        """分块读取企业名称所在的列，逐个产出去重后的企业名称
         
-        return companies
+        只解析指定列，内存占用与文件大小无关（只保留已出现的名称集合）。
+        """
+        encoding, delimiter = cls.sniff(stream, skip_rows)
+        options = dict(skiprows=skip_rows, encoding=encoding, sep=delimiter,
+                       encoding_errors="replace")
+    
+        # 先读取表头确认列数
+        header = pd.read_csv(stream, nrows=0, **options)
+        if column_index >= len(header.columns):
+            raise ValueError(f"列索引 {column_index} 超出范围，文件只有 {len(header.columns)} 列")
+        stream.seek(0)
+    
+        # 只读取指定列，按字符串读取避免数值被转为浮点数；
+        # 数据行字段多于表头时不把前几列当作行索引
+        seen = set()
+        with pd.read_csv(stream, usecols=[column_index], dtype=str, index_col=False,
+                         chunksize=CHUNK_ROWS, **options) as reader:
+            for chunk in reader:
+                for name in cls.clean_names(chunk.iloc[:, 0]):
+                    if name not in seen:
+                        seen.add(name)
+                        yield name
     
     @classmethod
     def can_handle(cls, file_extension: str) -> bool:
@@ -60,4 +108,4 @@ class CSVParser(FileParser):
     @property
     def name(cls) -> str:
         """解析器名称"""
-        return "csv" 
\ No newline at end of file
+        return "csv"
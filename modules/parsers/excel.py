@@ -1,8 +1,8 @@
 """Excel文件解析器 - 处理.xlsx和.xls文件"""
 import os
-import tempfile
 import logging
 import pandas as pd
+from openpyxl import load_workbook
 from typing import List
 
 from modules.parsers.base import FileParser
@@ -15,41 +15,39 @@ class ExcelParser(FileParser):
     """Excel文件解析器 - 支持.xlsx和.xls格式"""
     
     @classmethod
-    async def parse(cls, file, column_index: int = 0, skip_rows: int = 1) -> List[str]:
+    def parse_stream(cls, stream, column_index: int = 0, skip_rows: int = 1,
+                     filename: str = "") -> List[str]:
         """解析Excel文件提取企业名称"""
-        companies = []
-        
-        # 创建临时文件
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1])
-        
         try:
-            # 读取上传的文件内容
-            content = await file.read()
-            
-            # 写入临时文件
-            with open(temp_file.name, "wb") as f:
-                f.write(content)
-            
-            # 使用pandas读取Excel文件
-            df = pd.read_excel(temp_file.name, skiprows=skip_rows)
-            
-            # 提取指定列的企业名称
-            if column_index < len(df.columns):
-                companies = df.iloc[:, column_index].dropna().tolist()
-                # 清理公司名称
-                companies = [str(company).strip() for company in companies if str(company).strip()]
-            else:
-                raise ValueError(f"列索引 {column_index} 超出范围，文件只有 {len(df.columns)} 列")
-                
+            if os.path.splitext(filename)[1].lower() == '.xls':
+                # 旧版.xls格式由pandas（xlrd）读取
+                df = pd.read_excel(stream, skiprows=skip_rows)
+                if column_index >= len(df.columns):
+                    raise ValueError(f"列索引 {column_index} 超出范围，文件只有 {len(df.columns)} 列")
+                return cls.clean_names(df.iloc[:, column_index])
+            return cls.parse_xlsx(stream, column_index, skip_rows)
         except Exception as e:
             logger.error(f"解析Excel文件时出错: {str(e)}")
             raise e
-        finally:
-            # 删除临时文件
-            if os.path.exists(temp_file.name):
-                os.unlink(temp_file.name)
+    
+    @classmethod
+    def parse_xlsx(cls, stream, column_index: int = 0, skip_rows: int = 1) -> List[str]:
+        """以只读模式逐行读取.xlsx第一个工作表中企业名称所在的列
         
-        return companies
+        与 pandas.read_excel(skiprows=skip_rows) 一致：跳过指定行数后的下一行为表头。
+        """
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            if sheet.max_column is not None and column_index >= sheet.max_column:
+                raise ValueError(f"列索引 {column_index} 超出范围，文件只有 {sheet.max_column} 列")
+            
+            # 只读取指定列
+            values = sheet.iter_rows(min_row=skip_rows + 2, min_col=column_index + 1,
+                                     max_col=column_index + 1, values_only=True)
+            return cls.clean_names(row[0] for row in values)
+        finally:
+            workbook.close()
     
     @classmethod
     def can_handle(cls, file_extension: str) -> bool:
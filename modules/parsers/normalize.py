@@ -0,0 +1,108 @@
+"""企业名单规范化 - 统一名称写法、合并重复企业并保留原始写法
+
+上传名单中的同一家企业常有多种写法（全角/半角字符、多余空白、中英文括号、
+"有限公司"与"有限责任公司"等），每种写法都会触发一整套搜索。
+规范化后每家企业只搜索一次，搜索结果再对应回名单中的全部原始写法。
+"""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+# NFKC 之后统一为中文括号
+BRACKET_TABLE = str.maketrans({
+    "(": "（", ")": "）", "[": "（", "]": "）",
+    "【": "（", "】": "）", "〔": "（", "〕": "）",
+})
+
+# 名称中无意义的字符：零宽字符与各类引号
+NOISE_PATTERN = re.compile('[\u200b-\u200f\u2060\ufeff"\'“”‘’「」『』]')
+
+# 名单中的序号前缀，如 "1、"、"2." 与 "3)"（NFKC 之后）
+INDEX_PREFIX_PATTERN = re.compile(r'^\s*\d{1,4}\s*[、.)]\s*')
+
+# 首尾的标点（名单中常见的序号分隔符、句末标点等）
+EDGE_PUNCTUATION = " \t,，、;；:：.。!！?？·-—_/\\|"
+
+# 空白：中文字符之间的空白全部去掉，英文单词之间保留一个空格
+WHITESPACE_PATTERN = re.compile(r'\s+')
+CJK_SPACE_PATTERN = re.compile(r' (?=[^\x00-\x7f])|(?<=[^\x00-\x7f]) ')
+
+# 视为同一家企业的后缀写法：(变体, 统一写法)
+SUFFIX_VARIANTS = [
+    ("有限责任公司", "有限公司"),
+]
+
+
+def normalize_company_name(name: str) -> str:
+    """规范化企业名称写法（用于搜索与展示），不改变企业名称本身
+
+    NFKC 统一全角/半角字符，括号统一为中文括号，去掉引号、零宽字符、
+    序号前缀、首尾标点以及中文之间的空白。
+    """
+    if not name:
+        return ""
+    text = unicodedata.normalize("NFKC", str(name))
+    text = INDEX_PREFIX_PATTERN.sub("", NOISE_PATTERN.sub("", text)).translate(BRACKET_TABLE)
+    text = WHITESPACE_PATTERN.sub(" ", text)
+    text = CJK_SPACE_PATTERN.sub("", text)
+    return text.strip(EDGE_PUNCTUATION)
+
+
+def company_key(name: str) -> str:
+    """企业去重键：规范写法统一后缀并忽略英文大小写"""
+    key = normalize_company_name(name)
+    for variant, canonical in SUFFIX_VARIANTS:
+        if key.endswith(variant):
+            key = key[:-len(variant)] + canonical
+            break
+    return key.lower()
+
+
+class CompanyList:
+    """规范化并去重后的企业名单
+
+    names 为去重后的搜索名称（每组取第一次出现的写法的规范形式，保持名单顺序），
+    aliases 记录每个搜索名称对应的全部原始写法。
+    """
+
+    def __init__(self, companies: Iterable[str]):
+        self.names: List[str] = []
+        self.aliases: Dict[str, List[str]] = {}
+        self.total = 0
+        self._by_key: Dict[str, str] = {}
+
+        for original in companies:
+            if original is None:
+                continue
+            original = str(original)
+            key = company_key(original)
+            if not key:
+                continue
+            self.total += 1
+            name = self._by_key.get(key)
+            if name is None:
+                name = self._by_key[key] = normalize_company_name(original)
+                self.names.append(name)
+                self.aliases[name] = []
+            spelling = original.strip()
+            if spelling not in self.aliases[name]:
+                self.aliases[name].append(spelling)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    @property
+    def merged(self) -> int:
+        """合并掉的重复名称数"""
+        return self.total - len(self.names)
+
+    def canonical(self, name: str) -> Optional[str]:
+        """原始写法对应的搜索名称"""
+        return self._by_key.get(company_key(name))
+
+    def spellings(self, name: str) -> List[str]:
+        """搜索名称对应的全部原始写法"""
+        return self.aliases.get(name, [name])
@@ -1,6 +1,5 @@
 """Word文件解析器 - 处理.docx文件"""
 import os
-import tempfile
 import logging
 from typing import List
 
@@ -14,29 +13,20 @@ class WordParser(FileParser):
     """Word文件解析器 - 支持.docx格式"""
     
     @classmethod
-    async def parse(cls, file, column_index: int = 0, skip_rows: int = 1) -> List[str]:
+    def parse_stream(cls, stream, column_index: int = 0, skip_rows: int = 1,
+                     filename: str = "") -> List[str]:
         """解析Word文件提取企业名称"""
         companies = []
         
-        # 创建临时文件
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1])
-        
         try:
-            # 读取上传的文件内容
-            content = await file.read()
-            
-            # 写入临时文件
-            with open(temp_file.name, "wb") as f:
-                f.write(content)
-            
             # 使用python-docx处理Word文档
             import docx
             
             # 如果是.doc格式，无法直接处理，提示用户转换为.docx
-            if os.path.splitext(file.filename)[1].lower() == '.doc':
+            if os.path.splitext(filename)[1].lower() == '.doc':
                 raise ValueError("暂不支持旧版Word(.doc)格式，请将文件另存为.docx格式后重试")
                 
-            doc = docx.Document(temp_file.name)
+            doc = docx.Document(stream)
             
             # 获取文档中的所有段落文本
             all_text = []
@@ -54,7 +44,7 @@ class WordParser(FileParser):
                                 all_text.append(cells[column_index])
             
             # 清理企业名称
-            companies = [str(text).strip() for text in all_text if str(text).strip()]
+            companies = cls.clean_names(all_text)
                 
         except ImportError:
             logger.error("缺少python-docx库，无法解析Word文件")
@@ -62,10 +52,6 @@ class WordParser(FileParser):
         except Exception as e:
             logger.error(f"解析Word文件时出错: {str(e)}")
             raise e
-        finally:
-            # 删除临时文件
-            if os.path.exists(temp_file.name):
-                os.unlink(temp_file.name)
         
         return companies
     
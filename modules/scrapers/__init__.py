@@ -10,6 +10,9 @@ _scrapers = {}
 
 def register_scraper(scraper_class):
     """注册爬虫模块"""
+    # 预编译XPath选择器，解析时不再重复编译
+    if hasattr(scraper_class, "compile_selectors"):
+        scraper_class.compile_selectors()
     _scrapers[scraper_class.name] = scraper_class
     logger.info(f"已注册爬虫模块: {scraper_class.name} ({scraper_class.display_name})")
     return scraper_class
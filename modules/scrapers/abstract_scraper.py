@@ -2,15 +2,29 @@
 import logging
 import asyncio
 import random
-from typing import Dict, List, Any, Optional, Callable, Type
+from datetime import date, timedelta
+from typing import Dict, List, Any, Optional, Callable, Type, Union
 from lxml import etree
 from abc import ABC, abstractmethod
+import aiohttp
 import requests
 
+from modules.metrics import CACHE_HITS, stage_timer
 from modules.scrapers.base import BaseScraper
+from modules.scrapers import transport
+from modules.scrapers.announcements import announcement_key
+from modules.scrapers.archive import get_archive, window_date
+from modules.scrapers.cache import get_response_cache
+from modules.scrapers.sessions import get_session_pool
+from modules.scrapers.throttle import host_limiter
+from modules.scrapers.watermark import Watermark, get_watermark_store, parse_publish_date
+from modules.scrapers.workers import run_in_process_pool
 
 logger = logging.getLogger("bidscrap")
 
+# 改变搜索结果范围的参数，传入时不使用归档（归档按默认搜索条件抓取）
+ARCHIVE_EXCLUSIVE_KWARGS = ("keywords", "excluded_keywords", "location", "bid_types")
+
 class AbstractScraper(BaseScraper, ABC):
     """基于配置的通用爬虫实现"""
     
@@ -21,7 +35,8 @@ class AbstractScraper(BaseScraper, ABC):
         "result_selector": "",   # 结果列表选择器
         "page_param": "",        # 页码参数名
         "max_pages": 5,          # 最大页数
-        "rate_limit": 1.0,       # 频率限制
+        "rate_limit": 1.0,       # 频率限制（每秒请求数，按主机计算）
+        "rate_burst": 1,         # 允许的突发请求数
         "use_proxy": False,      # 是否使用代理
     }
     
@@ -36,6 +51,7 @@ class AbstractScraper(BaseScraper, ABC):
     # 详情页配置
     detail_config = {
         "enabled": False,              # 是否抓取详情
+        "concurrency": 4,              # 同一主机的详情页并发请求上限
         "fields": {                    # 字段提取配置
             "项目编号": {"selectors": []},
             "采购人": {"selectors": []},
@@ -46,63 +62,176 @@ class AbstractScraper(BaseScraper, ABC):
     # 添加默认超时设置
     request_timeout = 10  # 每个HTTP请求的超时时间(秒)
     scraper_timeout = 60  # 整个爬虫的最大执行时间(秒)
+    max_concurrency = 4  # 同时执行的搜索任务上限
+    use_process_pool = False  # 是否在解析进程池中执行页面解析与公司匹配
     
     @classmethod
     async def scrape(cls, company: str, start_date: str, end_date: str, **kwargs) -> List[Dict[str, Any]]:
-        """基于配置执行爬取"""
+        """基于配置执行爬取
+        
+        incremental=True 时只抓取上次水位之后的新公告，遇到已知公告即停止翻页；
+        传入 company_index（CompanyListMatcher）时为每条结果标注提到的所有名单企业；
+        传入 announcement_index（AnnouncementIndex）时其他公司已搜到的公告返回同一结果行，
+        不再重复抓取详情与提取实体。
+        
+        启用公告归档时，全量模式下归档已完整覆盖的日期直接从归档读取，
+        只实时抓取未覆盖的日期；抓取到的结果写入归档。
+        """
         logger.info(f"开始从{cls.display_name}抓取 {company} 的招投标信息")
         logger.info(f"准备搜索的公司名称: '{company}'")
         
-        # 准备搜索参数
-        search_params = cls.prepare_search_params(company, start_date, end_date, **kwargs)
         results = []
         seen_urls = set()
+        incremental = kwargs.pop("incremental", False)
+        
+        # 归档已覆盖的日期直接读取，只抓取未覆盖的部分（搜索条件与默认不同时不使用归档）
+        archive = get_archive()
+        window = (window_date(start_date), window_date(end_date))
+        live_window = window
+        use_archive = (archive is not None and not incremental and all(window)
+                       and not any(kwargs.get(name) for name in ARCHIVE_EXCLUSIVE_KWARGS))
+        if use_archive:
+            gaps = await archive.agaps(cls.name, company, *window)
+            live_window = (gaps[0][0], gaps[-1][1]) if gaps else None
+            results = await cls.load_archived(archive, company, window, live_window, seen_urls, **kwargs)
+            if live_window is None:
+                logger.info(f"{company} 的搜索窗口已全部归档，从归档读取 {len(results)} 条信息")
+                return results
+            if live_window != window:
+                logger.info(f"{company} 从归档读取 {len(results)} 条信息，"
+                            f"实时抓取 {live_window[0]} 至 {live_window[1]} 的公告")
+                start_date, end_date = (day.replace("-", ":") for day in live_window)
+        archived_count = len(results)
+        
+        # 准备搜索参数
+        search_params = cls.prepare_search_params(company, start_date, end_date, **kwargs)
+        
+        # 增量模式读取上次水位；全量模式从空水位开始，仅用于记录新水位
+        watermark_store = get_watermark_store()
+        if incremental:
+            watermark = await watermark_store.aload(cls.name, company)
+        else:
+            watermark = Watermark()
+        complete = True
+        # 达到最大页数时可能还有未抓取的结果
+        truncated = False
         
         try:
-            # 创建会话但不使用异步上下文管理器
-            session = cls.create_session()
+            # 从会话池借用长期会话（同一爬虫的各搜索任务共享连接）
+            session_pool = get_session_pool(cls)
+            session = await session_pool.acquire()
             
             try:
+                # 需要代理时为会话固定一个健康代理
+                if cls.site_config.get("use_proxy"):
+                    session._proxy = await cls.proxy_manager.get_proxy(session_key=id(session))
                 # 分页爬取
                 for page in range(1, cls.site_config.get("max_pages", 5) + 1):
                     # 更新页码
                     if cls.site_config["page_param"]:
                         search_params[cls.site_config["page_param"]] = str(page)
                     
-                    # 发送请求
+                    # 发送请求（增量模式需要最新的搜索结果，不使用搜索页缓存）
                     status, html_text = await cls.make_request(
                         cls.site_config["search_url"],
                         session=session,
                         params=search_params,
-                        headers=cls.prepare_headers()
+                        headers=cls.prepare_headers(),
+                        cache=None if incremental else "search"
                     )
                     
                     if status != 200 or not html_text:
                         logger.warning(f"请求第 {page} 页失败，状态码: {status}")
+                        complete = False
                         continue
                     
                     # 解析结果
                     new_results = await cls.parse_search_results(
-                        html_text, company, seen_urls, session, **kwargs
+                        html_text, company, seen_urls, session, watermark=watermark, **kwargs
                     )
+                    results.extend(new_results)
                     
-                    if not new_results:
+                    # 已到达上次抓取的位置，后续页均为旧公告
+                    if watermark.reached:
+                        logger.info(f"{company} 已到达增量水位，停止于第 {page} 页")
                         break
-                        
-                    results.extend(new_results)
                     
-                    # 频率控制
-                    await cls.rate_limit_sleep()
+                    if not new_results:
+                        break
+                else:
+                    truncated = True
             finally:
-                # 确保关闭会话
-                session.close()
+                # 归还会话
+                session_pool.release(session)
         
         except Exception as e:
             logger.error(f"爬取过程出错: {str(e)}")
+            complete = False
+        
+        # 只有完整抓取时才推进水位，避免遗漏失败页中的公告；
+        # 带筛选条件的搜索只覆盖部分公告，不更新按公司记录的水位
+        if complete and not any(kwargs.get(name) for name in ARCHIVE_EXCLUSIVE_KWARGS):
+            await watermark_store.asave(cls.name, company, watermark.advanced())
+        
+        # 写入归档；完整抓取的日期窗口（截至前一天，当天可能还有新公告）记为已覆盖
+        if archive is not None:
+            try:
+                await archive.asave(cls.name, results[archived_count:], company, live_window)
+                if use_archive and complete and not truncated:
+                    yesterday = (date.today() - timedelta(days=1)).isoformat()
+                    await archive.amark_covered(cls.name, company, live_window[0], min(live_window[1], yesterday))
+            except Exception as e:
+                logger.error(f"保存公告归档出错: {str(e)}")
             
         logger.info(f"从{cls.display_name}共抓取到 {len(results)} 条信息")
         return results
     
+    @classmethod
+    async def load_archived(cls, archive, company: str, window: tuple, live_window: Optional[tuple],
+                            seen_urls: set, **kwargs) -> List[Dict[str, Any]]:
+        """读取归档中该公司在搜索窗口内的结果，需要实时抓取的 live_window 内的公告除外
+        
+        发布日期无法解析的公告按抓取时的搜索窗口判断，窗口与搜索窗口重叠时从归档读取
+        （实时抓取到的同一公告按URL去重）。
+        结果按本次任务重新标注"匹配公司"，并登记到公告索引（传入时）。
+        """
+        company_index = kwargs.get("company_index")
+        announcement_index = kwargs.get("announcement_index")
+        with stage_timer("archive_query", cls.name):
+            _, rows = await archive.aquery(
+                company=company, start=window[0], end=window[1], source=cls.name, limit=None,
+                include_undated=True
+            )
+        
+        results = []
+        for row in rows:
+            day = (parse_publish_date(row['发布日期']) or "")[:10]
+            if day and live_window and live_window[0] <= day <= live_window[1]:
+                continue
+            seen_urls.add(row['链接'])
+            row['公司名称'] = company
+            if company_index is not None:
+                data = {"title": row['标题'], "content": row['内容摘要']}
+                row['匹配公司'] = cls.match_listed_companies(data, company, company_index)
+            else:
+                row.pop('匹配公司', None)
+            if announcement_index is not None:
+                row, _ = announcement_index.claim(row['链接'], row, company)
+            results.append(row)
+        return results
+    
+    @classmethod
+    @property
+    def rate_limit(cls) -> float:
+        """请求频率限制（每秒请求数），读取 site_config["rate_limit"]"""
+        return cls.site_config.get("rate_limit", 1.0)
+    
+    @classmethod
+    @property
+    def rate_burst(cls) -> int:
+        """允许的突发请求数，读取 site_config["rate_burst"]"""
+        return cls.site_config.get("rate_burst", 1)
+    
     @classmethod
     def prepare_search_params(cls, company: str, start_date: str, end_date: str, **kwargs) -> Dict:
         """准备搜索参数，子类需实现"""
@@ -124,52 +253,202 @@ class AbstractScraper(BaseScraper, ABC):
                                 seen_urls: set, session, **kwargs) -> List[Dict[str, Any]]:
         """解析搜索结果"""
         results = []
+        detail_targets = []
+        watermark = kwargs.pop("watermark", None)
+        company_index = kwargs.pop("company_index", None)
+        announcement_index = kwargs.pop("announcement_index", None)
+        fetch_details = cls.detail_config.get("enabled", False) and kwargs.get("fetch_details", True)
+        
+        # 解析与匹配（可在进程池中执行）；使用公告索引时实体只为首次出现的公告提取
+        with stage_timer("parse_search_results", cls.name):
+            items = await cls.run_parse(
+                "extract_search_items", html_text, company,
+                with_entities=announcement_index is None, **kwargs
+            )
+        
+        fresh = []
+        for data, result in items:
+            # 去重
+            if data.get("url"):
+                if data["url"] in seen_urls:
+                    continue
+                seen_urls.add(data["url"])
+            
+            # 增量水位检查（结果按发布时间倒序，遇到已知公告即可停止）
+            if watermark is not None:
+                if watermark.is_known(data.get("url"), data.get("date", "")):
+                    watermark.reached = True
+                    break
+                watermark.observe(data.get("url"), data.get("date", ""))
+            
+            if result is None:
+                continue
+            
+            # 一次扫描找出公告中提到的所有名单企业
+            if company_index is not None:
+                result['匹配公司'] = cls.match_listed_companies(data, company, company_index)
+            
+            # 其他公司已搜到的公告直接使用同一结果行（详情与实体由首次搜到的一方补充）
+            if announcement_index is not None:
+                result, created = announcement_index.claim(data.get("url"), result, company)
+                if not created:
+                    results.append(result)
+                    continue
+                fresh.append((data, result))
+            
+            # 获取详情（可选），稍后并发抓取
+            elif fetch_details:
+                detail_targets.append((result, data["url"]))
+            
+            results.append(result)
+        
+        if fresh:
+            await cls.complete_announcements(fresh, session, announcement_index, fetch_details)
+        elif detail_targets:
+            with stage_timer("fetch_details", cls.name):
+                await cls.fetch_details_concurrently(detail_targets, session)
+        
+        return results
+    
+    @classmethod
+    async def complete_announcements(cls, items: List[tuple], session, announcement_index,
+                                     fetch_details: bool):
+        """为首次出现的公告补充实体与详情
+        
+        归档中已有的公告直接使用保存的实体与详情，其余公告批量提取实体、并发抓取详情。
+        
+        Args:
+            items: (字段数据, 结果项) 列表
+            session: 请求会话
+            announcement_index: 本任务的公告索引
+            fetch_details: 是否抓取详情页
+        """
+        stored = await announcement_index.load(data.get("url") for data, _ in items)
+        
+        pending = []
+        detail_targets = []
+        for data, result in items:
+            record = stored.get(announcement_key(data.get("url")))
+            if record is None:
+                pending.append((data, result))
+                continue
+            result.update(cls.entity_fields(record["entities"]))
+            if not fetch_details:
+                continue
+            if record["details"] is not None:
+                result.update(record["details"])
+            else:
+                detail_targets.append((result, data["url"]))
+        
+        if pending:
+            texts = [f"{data.get('title', '')} {data.get('content', '')}" for data, _ in pending]
+            entities_list = await cls.run_parse("extract_entities_batch", texts)
+            for (data, result), entities in zip(pending, entities_list):
+                result.update(cls.entity_fields(entities))
+                if fetch_details and data.get("url"):
+                    detail_targets.append((result, data["url"]))
+        
+        if detail_targets:
+            with stage_timer("fetch_details", cls.name):
+                await cls.fetch_details_concurrently(detail_targets, session)
+    
+    @classmethod
+    def extract_search_items(cls, html_text: str, company: str, with_entities: bool = True,
+                             **kwargs) -> List[tuple]:
+        """解析搜索结果页并匹配公司（纯计算，不访问网络）
+        
+        with_entities=False 时结果项的实体字段留空，由调用方另行补充。
+        
+        Returns:
+            按页面顺序的 (字段数据, 结果项) 列表，不符合条件的条目结果项为None
+        """
+        items = []
         html = etree.HTML(html_text)
+        selectors = cls.get_compiled_selectors()
         
         # 获取结果列表
-        items = html.xpath(cls.site_config["result_selector"])
-        
-        for item in items:
+        for item in selectors["result"](html):
             try:
                 # 提取基础字段
                 data = {}
-                for field_name, config in cls.field_extractors.items():
-                    selector = config["selector"]
-                    attribute = config.get("attribute", "text")
-                    
-                    if attribute == "text":
-                        value = "".join(item.xpath(f"{selector}/text()")).strip()
-                    else:
-                        value = "".join(item.xpath(f"{selector}/@{attribute}")).strip()
-                    
-                    data[field_name] = value
+                for field_name, xpath in selectors["fields"].items():
+                    data[field_name] = "".join(xpath(item)).strip()
                 
                 # URL处理
-                if "url" in data and data["url"]:
-                    if not data["url"].startswith(('http://', 'https://')):
-                        data["url"] = cls.normalize_url(data["url"])
-                    
-                    # 去重
-                    if data["url"] in seen_urls:
-                        continue
-                    seen_urls.add(data["url"])
+                if data.get("url") and not data["url"].startswith(('http://', 'https://')):
+                    data["url"] = cls.normalize_url(data["url"])
                 
                 # 匹配检查
+                result = None
                 if cls.should_include_result(data, company, **kwargs):
-                    result = cls.build_result_item(data, company)
-                    
-                    # 获取详情（可选）
-                    if cls.detail_config.get("enabled", False) and kwargs.get("fetch_details", True):
-                        details = await cls.fetch_details(data["url"], session)
-                        if details:
-                            result.update(details)
-                    
-                    results.append(result)
+                    result = cls.build_result_item(data, company, with_entities)
+                
+                items.append((data, result))
             
             except Exception as e:
                 logger.error(f"解析项目时出错: {str(e)}")
         
-        return results
+        return items
+    
+    @classmethod
+    def compile_selectors(cls) -> Dict[str, Any]:
+        """将结果列表、字段提取与详情页选择器编译为 etree.XPath
+        
+        注册爬虫时调用一次，编译结果保存在爬虫类上；运行中修改选择器配置后需重新调用。
+        """
+        fields = {}
+        for field_name, config in cls.field_extractors.items():
+            selector = config["selector"]
+            attribute = config.get("attribute", "text")
+            if attribute == "text":
+                fields[field_name] = etree.XPath(f"{selector}/text()")
+            else:
+                fields[field_name] = etree.XPath(f"{selector}/@{attribute}")
+        
+        detail = {
+            field_name: [etree.XPath(selector) for selector in config.get("selectors", [])]
+            for field_name, config in cls.detail_config.get("fields", {}).items()
+        }
+        
+        cls._compiled_selectors = {
+            "result": etree.XPath(cls.site_config["result_selector"]),
+            "fields": fields,
+            "detail": detail,
+        }
+        return cls._compiled_selectors
+    
+    @classmethod
+    def get_compiled_selectors(cls) -> Dict[str, Any]:
+        """获取编译后的选择器（未注册的爬虫类在首次使用时编译）"""
+        compiled = cls.__dict__.get("_compiled_selectors")
+        if compiled is None:
+            compiled = cls.compile_selectors()
+        return compiled
+    
+    @classmethod
+    async def run_parse(cls, method: str, *args, **kwargs):
+        """执行解析方法：设置了 use_process_pool 时在解析进程池中执行，否则直接调用"""
+        if cls.use_process_pool:
+            return await run_in_process_pool(cls.name, method, *args, **kwargs)
+        return getattr(cls, method)(*args, **kwargs)
+    
+    @classmethod
+    async def fetch_details_concurrently(cls, targets: List[tuple], session):
+        """按主机限制并发抓取详情页，并按列表顺序写回结果
+        
+        Args:
+            targets: (结果项, 详情页URL) 列表
+            session: 请求会话
+        """
+        details_list = await asyncio.gather(
+            *(cls.fetch_details(url, session) for _, url in targets), return_exceptions=True
+        )
+        
+        for (result, url), details in zip(targets, details_list):
+            if isinstance(details, Exception):
+                logger.error(f"获取详情页出错: {url}, {str(details)}")
+            elif details:
+                result.update(details)
     
     @classmethod
     def should_include_result(cls, data: Dict[str, Any], company: str, **kwargs) -> bool:
@@ -193,11 +472,20 @@ class AbstractScraper(BaseScraper, ABC):
         return match_result["match"]
     
     @classmethod
-    def build_result_item(cls, data: Dict[str, Any], company: str) -> Dict[str, Any]:
+    def match_listed_companies(cls, data: Dict[str, Any], company: str, company_index) -> List[str]:
+        """返回公告提到的名单企业，搜索该公告的公司始终排在第一位"""
+        full_text = f"{data.get('title', '')} {data.get('content', '')}"
+        matched = [name for name in company_index.find(full_text) if name != company]
+        return [company] + matched
+    
+    @classmethod
+    def build_result_item(cls, data: Dict[str, Any], company: str,
+                          with_entities: bool = True) -> Dict[str, Any]:
         """构建结果项"""
         # 提取实体信息
-        full_text = f"{data.get('title', '')} {data.get('content', '')}"
-        entities = cls.extract_entities(full_text)
+        entities = {}
+        if with_entities:
+            entities = cls.extract_entities(f"{data.get('title', '')} {data.get('content', '')}")
         
         return {
             '公司名称': company,
@@ -206,44 +494,63 @@ class AbstractScraper(BaseScraper, ABC):
             '内容摘要': data.get('content', ''),
             '链接': data.get('url', ''),
             '数据来源': cls.display_name,
+            **cls.entity_fields(entities)
+        }
+    
+    @staticmethod
+    def entity_fields(entities: Dict[str, Any]) -> Dict[str, Any]:
+        """实体信息对应的结果字段"""
+        return {
             '地区': entities.get("locations", []),
             '金额': entities.get("amounts", []),
             '公告类型': entities.get("bid_type")
         }
     
+    @classmethod
+    def extract_entities_batch(cls, texts: List[str]) -> List[Dict[str, Any]]:
+        """批量提取实体信息（纯计算，可在进程池中执行）"""
+        return [cls.extract_entities(text) for text in texts]
+    
     @classmethod
     async def fetch_details(cls, url: str, session) -> Dict[str, Any]:
         """获取详情页信息"""
         if not cls.detail_config.get("enabled", False):
             return {}
         
-        details = {}
-        
         try:
-            status, html_text = await cls.make_request(url, session=session)
+            status, html_text = await cls.make_request(url, session=session, cache="detail")
             
             if status != 200 or not html_text:
-                return details
-                
-            html = etree.HTML(html_text)
+                return {}
+            
+            with stage_timer("parse_detail_page", cls.name):
+                return await cls.run_parse("parse_detail_page", html_text)
             
-            # 根据配置提取字段
-            for field_name, config in cls.detail_config["fields"].items():
-                selectors = config.get("selectors", [])
-                for selector in selectors:
-                    value = "".join(html.xpath(selector)).strip()
-                    if value:
-                        # 应用处理器（如果有）
-                        processor = config.get("processor")
-                        if processor and hasattr(cls, processor):
-                            value = getattr(cls, processor)(value)
-                        
-                        details[field_name] = value
-                        break
-                        
         except Exception as e:
             logger.error(f"获取详情页出错: {str(e)}")
             
+        return {}
+    
+    @classmethod
+    def parse_detail_page(cls, html_text: str) -> Dict[str, Any]:
+        """按配置从详情页提取字段（纯计算，不访问网络）"""
+        details = {}
+        html = etree.HTML(html_text)
+        
+        # 根据配置提取字段
+        for field_name, xpaths in cls.get_compiled_selectors()["detail"].items():
+            config = cls.detail_config["fields"][field_name]
+            for xpath in xpaths:
+                value = "".join(xpath(html)).strip()
+                if value:
+                    # 应用处理器（如果有）
+                    processor = config.get("processor")
+                    if processor and hasattr(cls, processor):
+                        value = getattr(cls, processor)(value)
+                    
+                    details[field_name] = value
+                    break
+        
         return details
     
     @classmethod
@@ -255,29 +562,60 @@ class AbstractScraper(BaseScraper, ABC):
 
     @classmethod
     @abstractmethod
-    def create_session(cls) -> requests.Session:
+    def create_session(cls) -> Union[aiohttp.ClientSession, requests.Session]:
         """
         创建并配置一个新的请求会话
         
+        会话由会话池长期持有，供多个公司、多个搜索任务并发共享。
+        推荐返回aiohttp.ClientSession以获得真正的异步请求；
+        返回requests.Session时请求会在线程池中执行，不会阻塞事件循环。
+        
         Returns:
-            requests.Session: 配置好的请求会话对象
+            配置好的请求会话对象
         """
         pass 
 
     @classmethod
-    async def make_request(cls, url, method="GET", session=None, **kwargs):
-        """发送HTTP请求"""
+    async def close_session(cls, session):
+        """关闭由create_session创建的会话"""
+        await transport.close_session(session)
+
+    @classmethod
+    def request_slot(cls, url: str, kind: str = "other"):
+        """详情页请求占用所属主机的并发名额（上限取 detail_config["concurrency"]）"""
+        if kind == "detail":
+            return host_limiter.get(url, cls.detail_config.get("concurrency"))
+        return super().request_slot(url, kind)
+    
+    @classmethod
+    async def make_request(cls, url, method="GET", session=None, cache=None, **kwargs):
+        """发送HTTP请求
+        
+        Args:
+            cache: 响应缓存类别（"search" 或 "detail"），为None时不使用缓存
+        """
+        kind = cache or "other"
         try:
+            # 优先读取响应缓存
+            response_cache = get_response_cache() if cache else None
+            params = kwargs.get("params")
+            if response_cache:
+                cached = await response_cache.aget(cache, method, url, params)
+                if cached is not None:
+                    CACHE_HITS.inc(scraper=cls.name, kind=kind)
+                    return 200, cached
+            
             # 设置请求超时时间
             kwargs.setdefault("timeout", cls.request_timeout)
             
-            # 发送请求
-            if method.upper() == "GET":
-                response = session.get(url, **kwargs)
-            else:
-                response = session.post(url, **kwargs)
+            # 发送请求（不阻塞事件循环），可恢复的失败按重试策略重试
+            status, text = await cls.send_with_retries(url, method, session, kind=kind, **kwargs)
+            
+            # 只缓存成功的响应
+            if response_cache and status == 200 and text:
+                await response_cache.aset(cache, method, url, text, params)
             
-            return response.status_code, response.text
+            return status, text
         except Exception as e:
             logger.error(f"请求出错: {str(e)}")
-            return 0, None 
\ No newline at end of file
+            return 0, None
@@ -0,0 +1,100 @@
+"""公告索引 - 按规范化URL记录本任务已处理的公告
+
+同一条公告常出现在名单中多家企业的搜索结果里。任务内共享一个索引后，
+每条公告只抓取一次详情页、只提取一次实体，导出时只占一行，
+"匹配公司"列汇总搜到或提到它的全部名单企业。
+启用公告归档时，归档中已有的公告直接复用保存的详情与实体。
+"""
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+logger = logging.getLogger("bidscrap")
+
+# 默认端口不计入主机名
+DEFAULT_PORTS = {("http", 80), ("https", 443)}
+
+# 路径中重复的斜杠
+SLASHES_PATTERN = re.compile(r'/{2,}')
+
+
+def announcement_key(url: str) -> str:
+    """公告去重键：忽略协议、默认端口、片段、路径末尾斜杠、主机名大小写与查询参数顺序"""
+    if not url:
+        return ""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return url
+    if port and (parts.scheme.lower(), port) not in DEFAULT_PORTS:
+        host = f"{host}:{port}"
+    path = SLASHES_PATTERN.sub("/", parts.path).rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+class AnnouncementIndex:
+    """单个搜索任务共享的公告索引
+
+    claim 在首次见到公告时登记其结果行，之后再搜到同一公告的企业得到同一个结果行，
+    并被追加到该行的"匹配公司"中。
+
+    Args:
+        store: AnnouncementArchive，提供时从中读取以往抓取保存的详情与实体
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        # 结果行 -> 搜到该公告的公司（按登记顺序，第一个为首次登记者）
+        self._finders: Dict[int, List[str]] = {}
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def claim(self, url: str, result: Dict[str, Any], company: str) -> Tuple[Dict[str, Any], bool]:
+        """登记公告，返回 (结果行, 是否首次出现)
+
+        已登记的公告返回首次登记的结果行（详情与实体由首次登记者补充），
+        result 被丢弃；没有URL的结果无法去重，始终视为首次出现。
+        """
+        key = announcement_key(url)
+        if not key:
+            return result, True
+        row = self._rows.get(key)
+        if row is None:
+            self._rows[key] = result
+            self._finders[id(result)] = [company]
+            return result, True
+
+        self.duplicates += 1
+        finders = self._finders[id(row)]
+        if company not in finders:
+            finders.append(company)
+        matched = row.get("匹配公司")
+        if matched is not None and company not in matched:
+            matched.append(company)
+        return row, False
+
+    def owner(self, row: Dict[str, Any]) -> Optional[str]:
+        """首次登记结果行的公司（负责补充详情与实体），未登记的结果行返回None"""
+        finders = self._finders.get(id(row))
+        return finders[0] if finders else None
+
+    def finders(self, row: Dict[str, Any]) -> List[str]:
+        """搜到该结果行对应公告的全部公司（区别于只在公告中被提到的公司）"""
+        return self._finders.get(id(row)) or [row.get("公司名称")]
+
+    async def load(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """从归档读取公告的详情与实体，返回 {去重键: {"details": 详情或None, "entities": 实体}}"""
+        if self.store is None:
+            return {}
+        keys = [key for key in (announcement_key(url) for url in urls) if key]
+        if not keys:
+            return {}
+        return await self.store.aload(keys)
@@ -0,0 +1,404 @@
+"""公告归档 - 保存抓取到的公告，按企业、关键词与日期范围直接查询
+
+公告（标题、摘要、详情、实体、来源、发布日期）及其关联企业保存在SQLite中，
+关键词检索使用FTS5全文索引（trigram分词，支持任意三个字以上的中文片段）。
+归档同时记录每个 (爬虫, 企业) 已完整抓取过的日期窗口：
+窗口内的搜索直接从归档读取，只有未覆盖的日期才需要实时抓取。
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import config
+from modules.parsers.normalize import company_key
+from modules.scrapers.announcements import announcement_key
+from modules.scrapers.watermark import parse_publish_date
+
+logger = logging.getLogger("bidscrap")
+
+# 结果项中非详情字段（其余字段视为详情页字段）
+BASE_FIELDS = {'公司名称', '名单写法', '标题', '发布日期', '内容摘要', '链接', '数据来源',
+               '地区', '金额', '公告类型', '匹配公司'}
+
+# 全文索引（trigram）可以检索的最短关键词长度，更短的关键词逐行匹配
+FTS_MIN_KEYWORD_LENGTH = 3
+
+# IN 查询每批的参数个数，避免超出SQLite参数数量上限
+QUERY_BATCH = 500
+
+
+def window_date(text: str) -> Optional[str]:
+    """将搜索日期（如 "2024:01:01"、"2024-01-01"）解析为 "YYYY-MM-DD"，无法解析时返回None"""
+    if not text:
+        return None
+    parsed = parse_publish_date(text.replace(":", "-"))
+    return parsed[:10] if parsed else None
+
+
+def shift_day(day: str, days: int) -> str:
+    return (date.fromisoformat(day) + timedelta(days=days)).isoformat()
+
+
+class AnnouncementArchive:
+    """公告归档 - 基于SQLite（FTS5）持久化
+
+    Args:
+        path: 数据库文件路径
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS announcements (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                source TEXT NOT NULL,
+                source_name TEXT,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                publish_date TEXT,
+                date_text TEXT,
+                bid_type TEXT,
+                locations TEXT NOT NULL,
+                amounts TEXT NOT NULL,
+                details TEXT,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS announcements_date ON announcements (publish_date);
+            CREATE TABLE IF NOT EXISTS announcement_companies (
+                announcement_id INTEGER NOT NULL,
+                company_key TEXT NOT NULL,
+                company TEXT NOT NULL,
+                UNIQUE (company_key, announcement_id)
+            );
+            CREATE INDEX IF NOT EXISTS announcement_companies_id ON announcement_companies (announcement_id);
+            CREATE TABLE IF NOT EXISTS undated_windows (
+                announcement_id INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                company_key TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                PRIMARY KEY (company_key, source, announcement_id, start_date, end_date)
+            );
+            CREATE TABLE IF NOT EXISTS coverage (
+                source TEXT NOT NULL,
+                company_key TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                PRIMARY KEY (source, company_key, start_date)
+            );
+        """)
+        self.fts = self._create_fts()
+        self._conn.commit()
+
+    def _create_fts(self) -> bool:
+        """创建全文索引（外部内容表，由触发器同步），SQLite未编译FTS5时退回逐行匹配"""
+        try:
+            self._conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS announcements_fts USING fts5(
+                    title, content, details, content='announcements', content_rowid='id', tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS announcements_ai AFTER INSERT ON announcements BEGIN
+                    INSERT INTO announcements_fts (rowid, title, content, details)
+                    VALUES (new.id, new.title, new.content, new.details);
+                END;
+                CREATE TRIGGER IF NOT EXISTS announcements_ad AFTER DELETE ON announcements BEGIN
+                    INSERT INTO announcements_fts (announcements_fts, rowid, title, content, details)
+                    VALUES ('delete', old.id, old.title, old.content, old.details);
+                END;
+                CREATE TRIGGER IF NOT EXISTS announcements_au AFTER UPDATE ON announcements BEGIN
+                    INSERT INTO announcements_fts (announcements_fts, rowid, title, content, details)
+                    VALUES ('delete', old.id, old.title, old.content, old.details);
+                    INSERT INTO announcements_fts (rowid, title, content, details)
+                    VALUES (new.id, new.title, new.content, new.details);
+                END;
+            """)
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite不支持FTS5全文索引，归档关键词查询将逐行匹配: {str(e)}")
+            return False
+
+    # ---- 写入 ----
+
+    def save(self, source: str, rows: Iterable[Dict[str, Any]], company: str = None,
+             window: Optional[Tuple[str, str]] = None):
+        """保存爬虫的结果项，并关联搜索企业与结果项"匹配公司"中的企业
+
+        已保存的公告更新字段；本次没有详情字段时保留已保存的详情。
+        window 为抓取时的搜索日期窗口（"YYYY-MM-DD"），发布日期无法解析的公告按该窗口归属。
+        """
+        now = time.time()
+        search_key = company_key(company) if company else ""
+        with self._lock:
+            for row in rows:
+                key = announcement_key(row.get('链接'))
+                if not key:
+                    continue
+                details = {name: value for name, value in row.items() if name not in BASE_FIELDS}
+                publish_date = parse_publish_date(row.get('发布日期', ''))
+                self._conn.execute(
+                    """
+                    INSERT INTO announcements (key, url, source, source_name, title, content, publish_date,
+                                               date_text, bid_type, locations, amounts, details, updated)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        title = excluded.title,
+                        content = excluded.content,
+                        publish_date = COALESCE(excluded.publish_date, announcements.publish_date),
+                        date_text = excluded.date_text,
+                        bid_type = excluded.bid_type,
+                        locations = excluded.locations,
+                        amounts = excluded.amounts,
+                        details = COALESCE(excluded.details, announcements.details),
+                        updated = excluded.updated
+                    """,
+                    (key, row.get('链接', ''), source, row.get('数据来源'), row.get('标题', ''),
+                     row.get('内容摘要', ''), publish_date,
+                     row.get('发布日期', ''), row.get('公告类型'),
+                     json.dumps(row.get('地区') or [], ensure_ascii=False),
+                     json.dumps(row.get('金额') or [], ensure_ascii=False),
+                     json.dumps(details, ensure_ascii=False) if details else None, now)
+                )
+                announcement_id = self._conn.execute(
+                    "SELECT id FROM announcements WHERE key = ?", (key,)
+                ).fetchone()[0]
+
+                companies = ([company] if company else []) + list(row.get('匹配公司') or [])
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO announcement_companies (announcement_id, company_key, company) "
+                    "VALUES (?, ?, ?)",
+                    [(announcement_id, company_key(name), name) for name in companies if company_key(name)]
+                )
+                if publish_date is None and search_key and window and all(window):
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO undated_windows "
+                        "(announcement_id, source, company_key, start_date, end_date) VALUES (?, ?, ?, ?, ?)",
+                        (announcement_id, source, search_key, *window)
+                    )
+            self._conn.commit()
+
+    def mark_covered(self, source: str, company: str, start: str, end: str):
+        """记录 (爬虫, 企业) 已完整抓取的日期窗口（"YYYY-MM-DD"，含首尾），与相邻窗口合并"""
+        if not start or not end or start > end:
+            return
+        key = company_key(company)
+        with self._lock:
+            intervals = self._conn.execute(
+                "SELECT start_date, end_date FROM coverage WHERE source = ? AND company_key = ? ORDER BY start_date",
+                (source, key)
+            ).fetchall()
+            merged = []
+            for interval_start, interval_end in sorted(intervals + [(start, end)]):
+                if merged and interval_start <= shift_day(merged[-1][1], 1):
+                    merged[-1][1] = max(merged[-1][1], interval_end)
+                else:
+                    merged.append([interval_start, interval_end])
+            self._conn.execute("DELETE FROM coverage WHERE source = ? AND company_key = ?", (source, key))
+            self._conn.executemany(
+                "INSERT INTO coverage (source, company_key, start_date, end_date) VALUES (?, ?, ?, ?)",
+                [(source, key, interval_start, interval_end) for interval_start, interval_end in merged]
+            )
+            self._conn.commit()
+
+    # ---- 查询 ----
+
+    def gaps(self, source: str, company: str, start: str, end: str) -> List[Tuple[str, str]]:
+        """返回日期窗口中归档尚未覆盖的部分，全部覆盖时返回空列表"""
+        with self._lock:
+            intervals = self._conn.execute(
+                "SELECT start_date, end_date FROM coverage "
+                "WHERE source = ? AND company_key = ? AND end_date >= ? AND start_date <= ? ORDER BY start_date",
+                (source, company_key(company), start, end)
+            ).fetchall()
+        gaps = []
+        cursor = start
+        for interval_start, interval_end in intervals:
+            if interval_start > cursor:
+                gaps.append((cursor, shift_day(interval_start, -1)))
+            cursor = max(cursor, shift_day(interval_end, 1))
+            if cursor > end:
+                return gaps
+        gaps.append((cursor, end))
+        return gaps
+
+    def load(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量读取公告的详情与实体：{去重键: {"details": 详情或None, "entities": 实体}}"""
+        records = {}
+        with self._lock:
+            for start in range(0, len(keys), QUERY_BATCH):
+                batch = keys[start:start + QUERY_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT key, details, locations, amounts, bid_type FROM announcements "
+                    f"WHERE key IN ({', '.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for key, details, locations, amounts, bid_type in rows:
+                    records[key] = {
+                        "details": json.loads(details) if details is not None else None,
+                        "entities": {
+                            "locations": json.loads(locations),
+                            "amounts": json.loads(amounts),
+                            "bid_type": bid_type,
+                        },
+                    }
+        return records
+
+    def query(self, company: str = None, keyword: str = None, start: str = None, end: str = None,
+              source: str = None, limit: Optional[int] = 100, offset: int = 0,
+              include_undated: bool = False) -> Tuple[int, List[Dict[str, Any]]]:
+        """按企业、关键词、发布日期范围（"YYYY-MM-DD"，含首尾）与来源查询公告
+
+        include_undated=True 时同时返回发布日期无法解析、但抓取时的搜索窗口与日期范围重叠的公告
+        （指定企业或来源时只看该企业、该来源的搜索窗口），从归档读取已覆盖窗口时需要一并返回。
+
+        Returns:
+            (符合条件的总数, 按发布日期倒序的结果项列表)，结果项的列与抓取结果相同
+        """
+        conditions, params = [], []
+        if company:
+            conditions.append("id IN (SELECT announcement_id FROM announcement_companies WHERE company_key = ?)")
+            params.append(company_key(company))
+        if keyword:
+            # 指定企业时候选公告很少，逐行匹配比全文索引取出全部命中再求交集更快
+            if self.fts and len(keyword) >= FTS_MIN_KEYWORD_LENGTH and not company:
+                conditions.append("id IN (SELECT rowid FROM announcements_fts WHERE announcements_fts MATCH ?)")
+                params.append('"' + keyword.replace('"', '""') + '"')
+            else:
+                pattern = "%" + keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                conditions.append("(title LIKE ? ESCAPE '\\' OR content LIKE ? ESCAPE '\\' "
+                                  "OR details LIKE ? ESCAPE '\\')")
+                params.extend([pattern] * 3)
+        dates, date_params = [], []
+        if start:
+            dates.append("publish_date >= ?")
+            date_params.append(start)
+        if end:
+            dates.append("publish_date <= ?")
+            date_params.append(f"{end} 23:59:59")
+        if dates:
+            if include_undated:
+                scopes, scope_params = [], []
+                if company:
+                    scopes.append("company_key = ?")
+                    scope_params.append(company_key(company))
+                if source:
+                    scopes.append("source = ?")
+                    scope_params.append(source)
+                if start:
+                    scopes.append("end_date >= ?")
+                    scope_params.append(start)
+                if end:
+                    scopes.append("start_date <= ?")
+                    scope_params.append(end)
+                conditions.append(
+                    f"((publish_date IS NULL AND id IN (SELECT announcement_id FROM undated_windows "
+                    f"WHERE {' AND '.join(scopes)})) OR ({' AND '.join(dates)}))"
+                )
+                params.extend(scope_params)
+            else:
+                conditions.extend(dates)
+            params.extend(date_params)
+        if source:
+            conditions.append("source = ?")
+            params.append(source)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM announcements {where}", params).fetchone()[0]
+            records = self._conn.execute(
+                f"SELECT id, url, source_name, title, content, date_text, bid_type, locations, amounts, details "
+                f"FROM announcements {where} ORDER BY publish_date DESC, id DESC LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset]
+            ).fetchall()
+            companies = self._companies([record[0] for record in records])
+
+        results = []
+        for (announcement_id, url, source_name, title, content, date_text, bid_type,
+             locations, amounts, details) in records:
+            names = companies.get(announcement_id, [])
+            if company:
+                # 查询的企业排在第一位
+                key = company_key(company)
+                names = sorted(names, key=lambda item: item[0] != key)
+            names = [name for _, name in names]
+            result = {
+                '公司名称': names[0] if names else (company or ''),
+                '标题': title,
+                '发布日期': date_text,
+                '内容摘要': content,
+                '链接': url,
+                '数据来源': source_name,
+                '地区': json.loads(locations),
+                '金额': json.loads(amounts),
+                '公告类型': bid_type,
+                '匹配公司': names,
+            }
+            if details:
+                result.update(json.loads(details))
+            results.append(result)
+        return total, results
+
+    def _companies(self, ids: List[int]) -> Dict[int, List[Tuple[str, str]]]:
+        """公告关联的企业：{公告id: [(企业去重键, 企业名称)]}，按关联顺序"""
+        companies: Dict[int, List[Tuple[str, str]]] = {}
+        for start in range(0, len(ids), QUERY_BATCH):
+            batch = ids[start:start + QUERY_BATCH]
+            for announcement_id, key, name in self._conn.execute(
+                f"SELECT announcement_id, company_key, company FROM announcement_companies "
+                f"WHERE announcement_id IN ({', '.join('?' * len(batch))}) ORDER BY rowid",
+                batch
+            ):
+                companies.setdefault(announcement_id, []).append((key, name))
+        return companies
+
+    async def asave(self, source: str, rows: List[Dict[str, Any]], company: str = None,
+                    window: Optional[Tuple[str, str]] = None):
+        await asyncio.to_thread(self.save, source, rows, company, window)
+
+    async def amark_covered(self, source: str, company: str, start: str, end: str):
+        await asyncio.to_thread(self.mark_covered, source, company, start, end)
+
+    async def agaps(self, source: str, company: str, start: str, end: str) -> List[Tuple[str, str]]:
+        return await asyncio.to_thread(self.gaps, source, company, start, end)
+
+    async def aload(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        return await asyncio.to_thread(self.load, keys)
+
+    async def aquery(self, **kwargs) -> Tuple[int, List[Dict[str, Any]]]:
+        return await asyncio.to_thread(self.query, **kwargs)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# 进程级公告归档实例（延迟创建）
+_archive: Optional[AnnouncementArchive] = None
+
+
+def get_archive() -> Optional[AnnouncementArchive]:
+    """获取公告归档，未启用归档时返回None"""
+    global _archive
+    if not config.ARCHIVE_ENABLED:
+        return None
+    if _archive is None:
+        _archive = AnnouncementArchive(os.path.join(config.OUTPUT_DIR, "state", "archive.sqlite3"))
+    return _archive
+
+
+def close_archive():
+    """关闭公告归档（应用关闭时调用）"""
+    global _archive
+    if _archive is not None:
+        _archive.close()
+        _archive = None
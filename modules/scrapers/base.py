@@ -4,95 +4,146 @@ import random
 import time
 import logging
 import asyncio
+import contextlib
 import aiohttp
+import requests
 import json
 import re
 from typing import List, Dict, Any, Optional, Union, Tuple
 from difflib import SequenceMatcher
-from datetime import datetime, timedelta
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from urllib.parse import urljoin, urlparse
 from fake_useragent import UserAgent
 
+import config
+from modules.metrics import REQUESTS, RESPONSE_BYTES, RETRIES, TIMEOUTS, stage_timer
+from modules.scrapers import transport
+from modules.scrapers.entities import get_entity_extractor
+from modules.scrapers.matcher import get_company_matcher
+from modules.scrapers.proxy_pool import ProxyPool
+from modules.scrapers.throttle import circuit_breakers, rate_limiter
+
 logger = logging.getLogger("bidscrap")
 
+@lru_cache(maxsize=1)
+def load_user_agents() -> Optional[UserAgent]:
+    """加载 fake_useragent 的User-Agent数据（进程内只加载一次），失败时返回None"""
+    try:
+        return UserAgent()
+    except Exception as e:
+        logger.warning(f"加载User-Agent数据失败，使用内置列表: {str(e)}")
+        return None
+
 class ProxyManager:
-    """代理管理器 - 管理和轮换IP代理"""
+    """代理管理器 - 获取代理列表并通过代理池按健康状况分配代理"""
     
-    def __init__(self, proxy_list: List[str] = None, proxy_api_url: str = None, api_key: str = None):
-        self.proxies = proxy_list or []
+    def __init__(self, proxy_list: List[str] = None, proxy_api_url: str = None, api_key: str = None,
+                 pool: ProxyPool = None):
+        self.static_proxies = list(proxy_list or [])
         self.proxy_api_url = proxy_api_url
         self.api_key = api_key
-        self.current_index = 0
-        self.last_refresh = datetime.now()
-        self.banned_proxies = set()
+        self.pool = pool or ProxyPool()
+        self.pool.update(self.static_proxies)
+        self.last_refresh = None
+        self._refresh_lock = None
+    
+    @property
+    def proxies(self) -> List[str]:
+        return self.pool.proxies
+    
+    @property
+    def banned_proxies(self) -> set:
+        return {proxy for proxy in self.pool.proxies if self.pool.stats(proxy).banned}
         
-    async def get_proxy(self) -> Optional[str]:
-        """获取下一个可用代理"""
-        # 如果代理列表为空或已经很久没刷新，则刷新代理列表
-        if (not self.proxies or 
-            (datetime.now() - self.last_refresh > timedelta(hours=1))):
-            await self.refresh_proxies()
-            
-        # 如果代理列表仍为空，返回None
-        if not self.proxies:
-            return None
-            
-        # 轮询获取下一个未被封禁的代理
-        for _ in range(len(self.proxies)):
-            proxy = self.proxies[self.current_index]
-            self.current_index = (self.current_index + 1) % len(self.proxies)
-            
-            if proxy not in self.banned_proxies:
-                return proxy
-                
-        # 如果所有代理都被禁用，返回None
-        return None
+    async def get_proxy(self, session_key=None) -> Optional[str]:
+        """获取一个健康的代理，指定 session_key 时同一会话固定使用同一代理
+        
+        代理列表为空、超过1小时未刷新或超过检测间隔时先刷新并检测。
+        """
+        if self._needs_refresh():
+            if self._refresh_lock is None:
+                self._refresh_lock = asyncio.Lock()
+            async with self._refresh_lock:
+                # 等待锁期间可能已由其他协程刷新
+                if self._needs_refresh():
+                    await self.refresh_proxies()
+        
+        # 没有可用代理时返回None（直接连接）
+        return self.pool.acquire(session_key)
+    
+    def _needs_refresh(self) -> bool:
+        if not self.static_proxies and not self.proxy_api_url:
+            return False
+        if self.last_refresh is None or datetime.now() - self.last_refresh > timedelta(hours=1):
+            return True
+        return time.monotonic() - self.pool.last_validated > config.PROXY_VALIDATE_INTERVAL
         
     async def refresh_proxies(self):
-        """刷新代理列表"""
-        if not self.proxy_api_url:
-            logger.warning("未配置代理API，无法刷新代理列表")
-            return
-            
-        try:
-            async with aiohttp.ClientSession() as session:
-                params = {"apikey": self.api_key} if self.api_key else {}
-                async with session.get(self.proxy_api_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if isinstance(data, list):
-                            self.proxies = data
-                        elif isinstance(data, dict) and "proxies" in data:
-                            self.proxies = data["proxies"]
+        """刷新代理列表（保留已有代理的健康统计）并并发检测"""
+        proxies = list(self.static_proxies)
+        if self.proxy_api_url:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    params = {"apikey": self.api_key} if self.api_key else {}
+                    async with session.get(self.proxy_api_url, params=params) as response:
+                        if response.status == 200:
+                            data = await response.json(content_type=None)
+                            if isinstance(data, list):
+                                proxies.extend(data)
+                            elif isinstance(data, dict) and "proxies" in data:
+                                proxies.extend(data["proxies"])
+                            else:
+                                logger.error(f"代理API返回格式异常: {data}")
                         else:
-                            logger.error(f"代理API返回格式异常: {data}")
-                            
-                        self.last_refresh = datetime.now()
-                        self.banned_proxies.clear()
-                        logger.info(f"成功刷新代理列表，获取到 {len(self.proxies)} 个代理")
-                    else:
-                        logger.error(f"刷新代理失败，状态码: {response.status}")
-        except Exception as e:
-            logger.error(f"刷新代理出错: {str(e)}")
+                            logger.error(f"刷新代理失败，状态码: {response.status}")
+            except Exception as e:
+                logger.error(f"刷新代理出错: {str(e)}")
+        
+        if proxies:
+            self.pool.update(proxies)
+            logger.info(f"成功刷新代理列表，获取到 {len(self.pool)} 个代理")
+        self.last_refresh = datetime.now()
+        await self.pool.validate()
+    
+    def report(self, proxy: str, success: bool, latency: float = None):
+        """反馈通过代理发送的请求结果"""
+        if proxy:
+            self.pool.record(proxy, success, latency)
+    
+    def release(self, session_key):
+        """会话结束，解除其固定的代理"""
+        self.pool.release(session_key)
             
     def mark_proxy_banned(self, proxy: str):
         """标记代理为已封禁"""
-        if proxy in self.proxies and proxy not in self.banned_proxies:
-            self.banned_proxies.add(proxy)
-            logger.warning(f"代理 {proxy} 已被标记为封禁")
+        self.pool.ban(proxy)
 
 class RetryStrategy:
-    """重试策略 - 处理请求失败的重试逻辑"""
+    """重试策略 - 处理请求失败的重试逻辑
+    
+    超时、连接错误以及 408/425/429/5xx 响应可以重试；其他4xx响应与
+    证书、参数等错误重试也不会成功，直接返回。
+    """
+    
+    # 可重试的HTTP状态码
+    RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
     
     def __init__(self, max_retries: int = 3, retry_delay: float = 2.0, 
-                 backoff_factor: float = 1.5, jitter: bool = True):
+                 backoff_factor: float = 1.5, jitter: bool = True,
+                 max_retry_after: float = 60.0):
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.backoff_factor = backoff_factor
         self.jitter = jitter
+        self.max_retry_after = max_retry_after
+        
+    def get_delay(self, retry_count: int, retry_after: float = None) -> float:
+        """计算重试延迟时间，服务器给出 Retry-After 时以其为准（不超过上限）"""
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
         
-    def get_delay(self, retry_count: int) -> float:
-        """计算重试延迟时间"""
         delay = self.retry_delay * (self.backoff_factor ** retry_count)
         
         # 添加随机抖动以避免同步请求
@@ -101,11 +152,44 @@ class RetryStrategy:
             
         return delay
         
-    async def sleep(self, retry_count: int):
+    async def sleep(self, retry_count: int, retry_after: float = None):
         """等待指定的重试延迟时间"""
-        delay = self.get_delay(retry_count)
+        delay = self.get_delay(retry_count, retry_after)
         logger.debug(f"重试等待 {delay:.2f} 秒...")
         await asyncio.sleep(delay)
+    
+    def is_retryable_status(self, status: int) -> bool:
+        """判断HTTP状态码是否值得重试"""
+        return status in self.RETRYABLE_STATUSES
+    
+    @staticmethod
+    def is_retryable_error(error: Exception) -> bool:
+        """判断请求异常是否值得重试：超时与连接错误可重试，证书错误等不可重试"""
+        if isinstance(error, (aiohttp.ClientSSLError, requests.exceptions.SSLError)):
+            return False
+        return isinstance(error, (
+            asyncio.TimeoutError,
+            aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError,
+            requests.ConnectionError,
+            requests.Timeout,
+        ))
+    
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """解析 Retry-After 响应头（秒数或HTTP日期），无法解析时返回None"""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
 
 class BaseScraper(ABC):
     """爬虫抽象基类 - 提供通用爬虫功能"""
@@ -119,10 +203,11 @@ class BaseScraper(ABC):
     ]
     
     # 静态代理管理器实例
-    proxy_manager = ProxyManager()
+    proxy_manager = ProxyManager(config.PROXY_LIST, config.PROXY_API_URL, config.PROXY_API_KEY)
     
     # 静态重试策略实例
-    retry_strategy = RetryStrategy()
+    retry_strategy = RetryStrategy(max_retries=config.REQUEST_MAX_RETRIES,
+                                   max_retry_after=config.RETRY_AFTER_MAX)
     
     # 请求计数和限速
     request_count = 0
@@ -135,6 +220,17 @@ class BaseScraper(ABC):
         "资格预审", "项目", "政府采购", "标书"
     ]
     
+    @classmethod
+    def random_user_agent(cls) -> str:
+        """随机选择一个User-Agent"""
+        user_agents = load_user_agents()
+        if user_agents is not None:
+            try:
+                return user_agents.random
+            except Exception:
+                pass
+        return random.choice(cls.USER_AGENT_LIST)
+    
     @classmethod
     def get_similarity(cls, str1: str, str2: str) -> float:
         """计算两个字符串的相似度"""
@@ -153,87 +249,11 @@ class BaseScraper(ABC):
             
         Returns:
             匹配结果，包含是否匹配、匹配类型、匹配度等信息
-        """
-        result = {
-            "match": False,
-            "type": None,
-            "score": 0.0,
-            "matched_text": None
-        }
-        
-        if not text or not company:
-            return result
-            
-        # 1. 精确匹配检查
-        if company in text:
-            result["match"] = True
-            result["type"] = "exact"
-            result["score"] = 1.0
-            result["matched_text"] = company
-            return result
             
-        # 2. 处理可能的公司简称（三个字及以上的公司名）
-        if len(company) >= 3:
-            # 提取公司行业/类型部分（如"科技"、"有限公司"等）
-            suffix_patterns = ["有限公司", "有限责任公司", "股份公司", "股份有限公司", "集团", "集团公司", "企业"]
-            company_name = company
-            
-            for pattern in suffix_patterns:
-                if pattern in company:
-                    company_name = company.replace(pattern, "").strip()
-                    # 如果简称在文本中，视为匹配
-                    if company_name and len(company_name) >= 2 and company_name in text:
-                        result["match"] = True
-                        result["type"] = "abbreviation"
-                        result["score"] = 0.9
-                        result["matched_text"] = company_name
-                        return result
-        
-        # 3. 对文本进行分词，查找可能的部分匹配
-        words = re.findall(r'[\w\u4e00-\u9fa5]+', text)
-        for word in words:
-            similarity = cls.get_similarity(company, word)
-            if len(word) >= 2 and similarity > threshold:
-                result["match"] = True
-                result["type"] = "fuzzy"
-                result["score"] = similarity
-                result["matched_text"] = word
-                
-                # 取最高相似度的匹配
-                if similarity > result.get("score", 0):
-                    result["score"] = similarity
-                    result["matched_text"] = word
-        
-        # 4. 上下文匹配分析（检查公司是否出现在特定上下文中）
-        if context_match and not result["match"]:
-            # 检查公司是否作为投标方
-            bidder_patterns = [
-                r'投标人[：:]\s*.*' + re.escape(company),
-                r'中标人[：:]\s*.*' + re.escape(company),
-                r'供应商[：:]\s*.*' + re.escape(company),
-                re.escape(company) + r'\s*为?中标单位',
-                re.escape(company) + r'\s*成为?供应商'
-            ]
-            
-            # 检查公司是否作为采购方
-            buyer_patterns = [
-                r'采购人[：:]\s*.*' + re.escape(company),
-                r'招标人[：:]\s*.*' + re.escape(company),
-                r'甲方[：:]\s*.*' + re.escape(company),
-                re.escape(company) + r'\s*[的]?采购项目'
-            ]
-            
-            for pattern in bidder_patterns + buyer_patterns:
-                if re.search(pattern, text):
-                    role_type = "bidder" if pattern in bidder_patterns else "buyer"
-                    result["match"] = True
-                    result["type"] = f"context_{role_type}"
-                    result["score"] = 0.85
-                    match = re.search(pattern, text)
-                    result["matched_text"] = match.group(0) if match else None
-                    return result
-                    
-        return result
+        匹配器按公司缓存，简称、正则等只在首次使用时构建一次。
+        """
+        with stage_timer("company_match", cls.name):
+            return get_company_matcher(company).match(text, threshold, context_match)
     
     @classmethod
     async def get_session(cls, use_proxy: bool = True, 
@@ -270,27 +290,94 @@ class BaseScraper(ABC):
     @classmethod
     async def make_request(cls, url, method="GET", session=None, **kwargs):
         """发送HTTP请求"""
-        try:
-            # 如果有代理配置但使用的是错误的参数名
-            if "proxy" in kwargs:
-                # 将proxy参数转换为正确的proxies参数
-                proxy_url = kwargs.pop("proxy")
-                if proxy_url:
-                    kwargs["proxies"] = {
-                        "http": proxy_url,
-                        "https": proxy_url
-                    }
+        return await cls.send_with_retries(url, method, session, **kwargs)
+    
+    @classmethod
+    async def send_with_retries(cls, url, method="GET", session=None, kind="other", **kwargs):
+        """发送HTTP请求，按 retry_strategy 重试可恢复的失败，返回(状态码, 响应文本)
+        
+        每次发送前经过主机熔断器与频率控制；429/503 等响应的 Retry-After 会被遵守，
+        并使同一主机的其他请求一起暂停。重试用尽后返回最后一次的状态码（异常时为0）。
+        
+        Args:
+            kind: 请求类别（"search"、"detail" 等），用于指标统计
+        """
+        strategy = cls.retry_strategy
+        breaker = circuit_breakers.get(url)
+        retry_count = 0
+        while True:
+            retry_after = None
+            # 会话固定的代理（未显式传入 proxy 时）
+            proxy = kwargs.get("proxy") or getattr(session, "_proxy", None)
+            probe = 0.0
+            try:
+                probe = await breaker.acquire()
+                
+                # 频率控制
+                await cls.rate_limit_sleep(url)
+                
+                # 发送请求（aiohttp会话直接异步发送，同步会话放入线程池执行）
+                # 并发名额只在发送期间占用，重试等待时让给其他请求
+                async with cls.request_slot(url, kind):
+                    start = time.perf_counter()
+                    with stage_timer(f"{kind}_request", cls.name):
+                        status, text, headers = await transport.fetch(session, url, method, **kwargs)
+                    latency = time.perf_counter() - start
+                REQUESTS.inc(scraper=cls.name, kind=kind, status=status)
+                if text:
+                    RESPONSE_BYTES.inc(len(text), scraper=cls.name, kind=kind)
+                
+                if not strategy.is_retryable_status(status):
+                    breaker.record_success()
+                    cls.proxy_manager.report(proxy, True, latency)
+                    return status, text
+                
+                retry_after = strategy.parse_retry_after(headers.get("retry-after"))
+                breaker.record_failure(retry_after, throttled=status == 429)
+                cls.proxy_manager.report(proxy, False)
+                reason = str(status)
+                if retry_count >= strategy.max_retries:
+                    logger.warning(f"请求失败，已重试 {retry_count} 次，状态码: {status}: {url}")
+                    return status, text
+            except Exception as e:
+                timed_out = isinstance(e, (asyncio.TimeoutError, requests.Timeout))
+                REQUESTS.inc(scraper=cls.name, kind=kind, status="timeout" if timed_out else "error")
+                if timed_out:
+                    TIMEOUTS.inc(scraper=cls.name, scope="request")
+                if not strategy.is_retryable_error(e):
+                    logger.error(f"请求出错: {str(e)}")
+                    return 0, None
+                # 经代理的连接错误归咎于代理，不触发主机熔断
+                if proxy:
+                    cls.proxy_manager.report(proxy, False)
+                else:
+                    breaker.record_failure()
+                reason = "timeout" if timed_out else "connection"
+                if retry_count >= strategy.max_retries:
+                    logger.error(f"请求{'超时' if timed_out else '出错'}，已重试 {retry_count} 次: {url} {str(e)}")
+                    return 0, None
+            finally:
+                # 试探请求没有得出主机状态（不可重试的异常、经代理的连接错误、任务取消）时结束试探
+                breaker.release_probe(probe)
             
-            # 发送请求
-            if method.upper() == "GET":
-                response = session.get(url, **kwargs)
-            else:
-                response = session.post(url, **kwargs)
+            RETRIES.inc(scraper=cls.name, reason=reason)
+            logger.debug(f"第 {retry_count + 1} 次重试（{reason}）: {url}")
+            await strategy.sleep(retry_count, retry_after)
+            retry_count += 1
             
-            return response.status_code, response.text
-        except Exception as e:
-            logger.error(f"请求出错: {str(e)}")
-            return 0, None
+            # 会话固定的代理不再健康时换用其他代理
+            if proxy and "proxy" not in kwargs and session is not None:
+                session._proxy = await cls.proxy_manager.get_proxy(session_key=id(session))
+    
+    @classmethod
+    def request_slot(cls, url: str, kind: str = "other"):
+        """返回发送请求时需要占用的并发名额（异步上下文管理器），默认不限制"""
+        return contextlib.nullcontext()
+    
+    @classmethod
+    async def rate_limit_sleep(cls, url: str):
+        """按 rate_limit 等待请求许可，同一爬虫对同一主机的请求共享令牌桶"""
+        await rate_limiter.acquire(cls.name, url, cls.rate_limit, cls.rate_burst)
     
     @classmethod
     async def handle_captcha(cls, session, url, image_selector=".captcha-image", 
@@ -347,113 +434,18 @@ class BaseScraper(ABC):
     @classmethod
     def extract_amount(cls, text: str) -> Optional[float]:
         """从文本中提取金额信息"""
-        # 匹配常见的金额格式，如"1.23亿元"、"456万元"、"7,890元"等
-        amount_patterns = [
-            r'(\d[\d,]*\.?\d*)\s*亿元',   # 亿元
-            r'(\d[\d,]*\.?\d*)\s*万元',   # 万元
-            r'(\d[\d,]*\.?\d*)\s*千元',   # 千元
-            r'(\d[\d,]*\.?\d*)\s*元',     # 元
-            r'(\d[\d,]*\.?\d*)\s*RMB',    # RMB
-            r'￥\s*(\d[\d,]*\.?\d*)',      # ￥符号
-            r'人民币\s*(\d[\d,]*\.?\d*)'   # 人民币
-        ]
-        
-        for pattern in amount_patterns:
-            match = re.search(pattern, text)
-            if match:
-                amount_str = match.group(1).replace(',', '')
-                amount = float(amount_str)
-                
-                # 根据单位转换为元
-                if '亿元' in text:
-                    amount *= 100_000_000
-                elif '万元' in text:
-                    amount *= 10_000
-                elif '千元' in text:
-                    amount *= 1_000
-                    
-                return amount
-                
-        return None
+        return get_entity_extractor().extract_amount(text)
         
     @classmethod
     def extract_date(cls, text: str) -> Optional[str]:
         """从文本中提取日期信息"""
-        # 匹配常见的日期格式
-        date_patterns = [
-            r'(\d{4}[年/-]\d{1,2}[月/-]\d{1,2}日?)',  # 2023年01月01日
-            r'(\d{4}[年/-]\d{1,2}[月/-]\d{1,2})',     # 2023-01-01
-            r'(\d{2}[年/-]\d{1,2}[月/-]\d{1,2})'      # 23/01/01
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text)
-            if match:
-                date_str = match.group(1)
-                
-                # 标准化日期格式
-                date_str = date_str.replace('年', '-').replace('月', '-').replace('日', '')
-                
-                # 补全年份（如果是两位数）
-                if re.match(r'\d{2}-', date_str):
-                    year = int(date_str[:2])
-                    current_year = datetime.now().year % 100
-                    century = 2000 if year <= current_year else 1900
-                    date_str = f"{century + year}{date_str[2:]}"
-                    
-                return date_str
-                
-        return None
+        return get_entity_extractor().extract_date(text)
         
     @classmethod
     def extract_entities(cls, text: str) -> Dict[str, Any]:
-        """从文本中提取实体信息"""
-        entities = {
-            "companies": [],
-            "locations": [],
-            "dates": [],
-            "amounts": [],
-            "bid_type": None
-        }
-        
-        # 提取日期
-        date = cls.extract_date(text)
-        if date:
-            entities["dates"].append(date)
-            
-        # 提取金额
-        amount = cls.extract_amount(text)
-        if amount:
-            entities["amounts"].append(amount)
-            
-        # 提取招标类型
-        bid_types = {
-            "公开招标": ["公开招标", "公开"],
-            "邀请招标": ["邀请招标", "邀请", "邀标"],
-            "竞争性谈判": ["竞争性谈判", "竞谈"],
-            "竞争性磋商": ["竞争性磋商", "磋商"],
-            "询价采购": ["询价", "询价采购"],
-            "单一来源": ["单一来源", "单一"],
-            "中标公告": ["中标公告", "中标结果", "中标"],
-            "更正公告": ["更正公告", "变更", "澄清"]
-        }
-        
-        for bid_type, keywords in bid_types.items():
-            for keyword in keywords:
-                if keyword in text:
-                    entities["bid_type"] = bid_type
-                    break
-            if entities["bid_type"]:
-                break
-                
-        # 提取地区（可扩展）
-        locations = ["北京", "上海", "广州", "深圳", "天津", "重庆", "杭州", 
-                    "南京", "武汉", "成都", "西安", "长沙", "青岛", "厦门"]
-        for location in locations:
-            if location in text:
-                entities["locations"].append(location)
-                
-        return entities
+        """从文本中提取实体信息（日期、金额、招标类型、地区）"""
+        with stage_timer("extract_entities", cls.name):
+            return get_entity_extractor().extract(text)
     
     @classmethod
     @abstractmethod
@@ -492,4 +484,10 @@ class BaseScraper(ABC):
     @property
     def rate_limit(cls) -> float:
         """请求频率限制（每秒请求数）"""
-        return 1.0 
\ No newline at end of file
+        return 1.0
+    
+    @classmethod
+    @property
+    def rate_burst(cls) -> int:
+        """允许的突发请求数"""
+        return 1 
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""批量结果处理 - 用pandas对原始结果行批量筛选并构建结果项
+
+适用于对已保存的结果重新处理（例如调整 match_threshold 或排除关键词后重新筛选），
+排除关键词、日期与金额标准化、招标类型判断均按列向量化计算，
+输出列与 AbstractScraper.build_result_item 相同。
+"""
+import logging
+import re
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from modules.scrapers.entities import BID_TYPES, NUMBER_PATTERN, UNIT_MULTIPLIERS, get_entity_extractor
+from modules.scrapers.matcher import company_abbreviations, get_company_matcher
+from modules.scrapers.watermark import PUBLISH_DATE_PATTERN
+
+logger = logging.getLogger("bidscrap")
+
+# 原始结果行的列：搜索公司、爬虫字段提取器的字段、数据来源
+RAW_COLUMNS = ["company", "title", "date", "content", "url", "source"]
+
+# 结果项的列，与 AbstractScraper.build_result_item 一致
+RESULT_COLUMNS = ['公司名称', '标题', '发布日期', '内容摘要', '链接', '数据来源', '地区', '金额', '公告类型']
+
+# 导出结果列 -> 原始列，用于重新处理导出的结果文件
+RESULT_TO_RAW = {
+    '公司名称': "company",
+    '标题': "title",
+    '发布日期': "date",
+    '内容摘要': "content",
+    '链接': "url",
+    '数据来源': "source",
+}
+
+# 金额写法按优先级排列，与 EntityExtractor.extract_amount 相同
+AMOUNT_PATTERNS = [
+    re.compile(rf'({NUMBER_PATTERN})\s*亿元'),
+    re.compile(rf'({NUMBER_PATTERN})\s*万元'),
+    re.compile(rf'({NUMBER_PATTERN})\s*千元'),
+    re.compile(rf'({NUMBER_PATTERN})\s*元'),
+    re.compile(rf'({NUMBER_PATTERN})\s*RMB'),
+    re.compile(rf'￥\s*({NUMBER_PATTERN})'),
+    re.compile(rf'人民币\s*({NUMBER_PATTERN})'),
+]
+
+# 每种招标类型的关键词合并为一个正则
+BID_TYPE_PATTERNS = [
+    (bid_type, re.compile("|".join(re.escape(keyword) for keyword in keywords)))
+    for bid_type, keywords in BID_TYPES.items()
+]
+
+
+def results_to_raw(results: pd.DataFrame) -> pd.DataFrame:
+    """将导出的结果表转换为原始结果行"""
+    return results.rename(columns=RESULT_TO_RAW).reindex(columns=RAW_COLUMNS)
+
+
+def full_text_of(raw: pd.DataFrame) -> pd.Series:
+    """标题与内容拼接的全文，与逐行处理时使用的文本相同"""
+    return raw["title"] + " " + raw["content"]
+
+
+def exclusion_mask(text: pd.Series, excluded_keywords: Iterable[str]) -> pd.Series:
+    """不包含任何排除关键词的行"""
+    keywords = [keyword for keyword in excluded_keywords or [] if keyword]
+    if not keywords:
+        return pd.Series(True, index=text.index)
+    pattern = "|".join(re.escape(keyword) for keyword in keywords)
+    return ~text.str.contains(pattern, regex=True)
+
+
+def company_match_mask(companies: pd.Series, text: pd.Series, threshold: float = 0.8) -> pd.Series:
+    """与 is_company_match 结果相同的匹配掩码
+
+    精确匹配和简称匹配按公司分组向量化判断，只有剩余的行才逐行做模糊与上下文匹配。
+    """
+    matched = pd.Series(False, index=text.index)
+    for company, index in companies.groupby(companies, sort=False).groups.items():
+        if not company:
+            continue
+        group_text = text.loc[index]
+        hit = group_text.str.contains(company, regex=False)
+        for name in company_abbreviations(company):
+            hit |= group_text.str.contains(name, regex=False)
+
+        rest = group_text[~hit]
+        if not rest.empty:
+            # 同一公告常被重复保存，每个不同文本只匹配一次
+            matcher = get_company_matcher(company)
+            lookup = {value: matcher.match(value, threshold)["match"] for value in rest.unique()}
+            hit[~hit] = rest.map(lookup).astype(bool)
+        matched.loc[index] = hit
+    return matched
+
+
+def publish_dates(dates: pd.Series) -> pd.Series:
+    """将发布日期文本标准化为时间，无法解析时为NaT"""
+    parts = dates.str.extract(PUBLISH_DATE_PATTERN).fillna(0)
+    if parts.empty:
+        return pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+    return pd.to_datetime(pd.DataFrame({
+        "year": parts[0], "month": parts[1], "day": parts[2],
+        "hour": parts[3], "minute": parts[4], "second": parts[5],
+    }).astype(int), errors="coerce")
+
+
+def amounts_of(text: pd.Series) -> pd.Series:
+    """按写法优先级提取金额（元），换算单位按全文出现的最大单位"""
+    amount = pd.Series(np.nan, index=text.index)
+    for pattern in AMOUNT_PATTERNS:
+        missing = amount.isna()
+        if not missing.any():
+            break
+        values = text[missing].str.extract(pattern, expand=False)
+        amount[missing] = pd.to_numeric(values.str.replace(",", "", regex=False), errors="coerce")
+
+    multiplier = np.select(
+        [text.str.contains(unit, regex=False) for unit, _ in UNIT_MULTIPLIERS],
+        [value for _, value in UNIT_MULTIPLIERS],
+        default=1
+    )
+    return amount * multiplier
+
+
+def bid_types_of(text: pd.Series) -> pd.Series:
+    """按类型顺序判断招标类型，先命中的类型优先"""
+    if text.empty:
+        return pd.Series(None, index=text.index, dtype=object)
+    result = np.select(
+        [text.str.contains(pattern) for _, pattern in BID_TYPE_PATTERNS],
+        [bid_type for bid_type, _ in BID_TYPE_PATTERNS],
+        default=None
+    )
+    return pd.Series(result, index=text.index, dtype=object)
+
+
+def process_results(raw: pd.DataFrame, excluded_keywords: Optional[List[str]] = None,
+                    match_threshold: float = 0.8, source: Optional[str] = None,
+                    start_date: Optional[str] = None, end_date: Optional[str] = None,
+                    company_index=None) -> pd.DataFrame:
+    """批量筛选原始结果行并构建结果项
+
+    Args:
+        raw: 原始结果行，列见 RAW_COLUMNS（缺少的列按空值处理）
+        excluded_keywords: 排除关键词
+        match_threshold: 公司模糊匹配阈值
+        source: 数据来源名称，为空时使用原始行的 source 列
+        start_date/end_date: 发布日期范围（YYYY:MM:DD 或 YYYY-MM-DD），无法解析日期的行保留
+        company_index: CompanyListMatcher，提供时增加“匹配公司”列
+
+    Returns:
+        结果表，列与 build_result_item 相同
+    """
+    df = raw.reindex(columns=RAW_COLUMNS).fillna("").astype(str)
+    text = full_text_of(df)
+
+    keep = exclusion_mask(text, excluded_keywords)
+    if start_date or end_date:
+        dates = publish_dates(df["date"])
+        if start_date:
+            keep &= dates.isna() | (dates >= pd.Timestamp(start_date.replace(":", "-")))
+        if end_date:
+            end = pd.Timestamp(end_date.replace(":", "-")) + pd.Timedelta(days=1)
+            keep &= dates.isna() | (dates < end)
+    keep[keep] = company_match_mask(df["company"][keep], text[keep], match_threshold)
+
+    df, text = df[keep], text[keep]
+    extractor = get_entity_extractor()
+    amounts = amounts_of(text)
+
+    results = pd.DataFrame({
+        '公司名称': df["company"],
+        '标题': df["title"],
+        '发布日期': df["date"],
+        '内容摘要': df["content"],
+        '链接': df["url"],
+        '数据来源': source if source is not None else df["source"],
+        '地区': text.map(extractor.extract_locations),
+        '金额': [[value] if value else [] for value in amounts.fillna(0)],
+        '公告类型': bid_types_of(text),
+    }, columns=RESULT_COLUMNS, index=df.index)
+
+    if company_index is not None:
+        results['匹配公司'] = [
+            [company] + [name for name in company_index.find(value) if name != company]
+            for company, value in zip(df["company"], text)
+        ]
+
+    logger.info(f"批量处理 {len(raw)} 条原始结果，保留 {len(results)} 条")
+    return results.reset_index(drop=True)
@@ -0,0 +1,188 @@
+"""HTTP响应缓存 - 基于SQLite的持久化缓存，支持分类TTL与LRU淘汰"""
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import config
+
+logger = logging.getLogger("bidscrap")
+
+
+def normalize_url(url: str, params: dict = None) -> str:
+    """标准化URL：小写协议与主机、去掉默认端口和锚点、合并并排序查询参数"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items() if v is not None)
+    query.sort()
+
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(query), ""))
+
+
+class ResponseCache:
+    """HTTP响应缓存
+
+    - 按缓存类别（如 search、detail）设置不同的过期时间
+    - 总大小超过上限时按最近访问时间淘汰（LRU）
+    - 记录命中、未命中、过期和淘汰次数
+    """
+
+    def __init__(self, path: str, ttls: Dict[str, float], max_bytes: int):
+        self.path = path
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.stats_counter = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "stores": 0}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    @staticmethod
+    def make_key(method: str, url: str, params: dict = None) -> str:
+        """根据请求方法、标准化URL和参数生成缓存键"""
+        normalized = f"{method.upper()} {normalize_url(url, params)}"
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, kind: str, method: str, url: str, params: dict = None) -> Optional[str]:
+        """读取缓存，未命中或已过期返回None"""
+        key = self.make_key(method, url, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, size, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats_counter["misses"] += 1
+                return None
+
+            body, size, created = row
+            if now - created > self.ttls.get(kind, 0):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total_bytes -= size
+                self.stats_counter["expired"] += 1
+                self.stats_counter["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats_counter["hits"] += 1
+
+        return zlib.decompress(body).decode("utf-8")
+
+    def set(self, kind: str, method: str, url: str, text: str, params: dict = None):
+        """写入缓存，并在超出大小上限时淘汰最久未访问的条目"""
+        if self.ttls.get(kind, 0) <= 0:
+            return
+
+        key = self.make_key(method, url, params)
+        body = zlib.compress(text.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, kind, url, body, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, url, body, len(body), now, now)
+            )
+            self._total_bytes += len(body) - (old[0] if old else 0)
+            self.stats_counter["stores"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """按最近访问时间淘汰条目，直到总大小不超过上限（调用方需持有锁）"""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.stats_counter["evictions"] += 1
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    async def aget(self, kind: str, method: str, url: str, params: dict = None) -> Optional[str]:
+        """异步读取缓存（在线程中执行SQLite操作）"""
+        return await asyncio.to_thread(self.get, kind, method, url, params)
+
+    async def aset(self, kind: str, method: str, url: str, text: str, params: dict = None):
+        """异步写入缓存（在线程中执行SQLite操作）"""
+        await asyncio.to_thread(self.set, kind, method, url, text, params)
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存统计信息"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return dict(self.stats_counter, entries=entries, bytes=self._total_bytes)
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+# 进程级响应缓存实例（延迟创建）
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """获取响应缓存，未启用时返回None"""
+    global _response_cache
+    if not config.HTTP_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            os.path.join(config.OUTPUT_DIR, "cache", "http_cache.sqlite3"),
+            ttls={
+                "search": config.HTTP_CACHE_SEARCH_TTL,
+                "detail": config.HTTP_CACHE_DETAIL_TTL,
+            },
+            max_bytes=config.HTTP_CACHE_MAX_BYTES
+        )
+    return _response_cache
+
+
+def close_response_cache():
+    """关闭响应缓存（应用关闭时调用）"""
+    global _response_cache
+    if _response_cache is not None:
+        stats = _response_cache.stats()
+        logger.info(f"响应缓存统计: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, "
+                    f"共 {stats['entries']} 条")
+        _response_cache.close()
+        _response_cache = None
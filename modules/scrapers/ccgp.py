@@ -1,8 +1,8 @@
 """中国政府采购网爬虫"""
 from modules.scrapers.abstract_scraper import AbstractScraper
 from modules.scrapers import register_scraper
-import requests
-from fake_useragent import UserAgent
+from modules.scrapers import transport
+import aiohttp
 
 @register_scraper
 class CCGPScraper(AbstractScraper):
@@ -15,7 +15,8 @@ class CCGPScraper(AbstractScraper):
         "result_selector": "//div[@class='vT-srch-result-list-bid']//li",
         "page_param": "page_index",
         "max_pages": 5,
-        "rate_limit": 0.5,
+        "rate_limit": 0.5,  # 每个主机每秒请求数
+        "rate_burst": 1,
     }
     
     # 字段提取配置
@@ -29,6 +30,7 @@ class CCGPScraper(AbstractScraper):
     # 详情页配置
     detail_config = {
         "enabled": True,
+        "concurrency": 4,  # 同一主机的详情页并发请求上限
         "fields": {
             "项目编号": {"selectors": [
                 "//div[contains(text(), '项目编号')]/following-sibling::div[1]/text()",
@@ -48,6 +50,7 @@ class CCGPScraper(AbstractScraper):
     # 设置特定爬虫的超时时间
     request_timeout = 15  # 每个HTTP请求的超时时间(秒)
     scraper_timeout = 120  # 整个爬虫的最大执行时间(秒)
+    max_concurrency = 4  # 同时搜索的公司数上限
     
     @classmethod
     @property
@@ -90,20 +93,17 @@ class CCGPScraper(AbstractScraper):
         } 
     
     @classmethod
-    def create_session(cls) -> requests.Session:
+    def create_session(cls) -> aiohttp.ClientSession:
         """
-        创建并配置中国政府采购网专用的请求会话
+        创建并配置中国政府采购网专用的异步请求会话
         
         Returns:
-            requests.Session: 配置好的请求会话对象
+            aiohttp.ClientSession: 配置好的请求会话对象
         """
-        session = requests.Session()
-        # 设置随机User-Agent
-        ua = UserAgent()
-        session.headers.update({
-            'User-Agent': ua.random,
+        # 设置随机User-Agent（User-Agent数据只加载一次）
+        return transport.create_client_session(headers={
+            'User-Agent': cls.random_user_agent(),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.8,zh-TW;q=0.7,zh-HK;q=0.5,en-US;q=0.3,en;q=0.2',
             'Connection': 'keep-alive',
-        })
-        return session 
\ No newline at end of file
+        }) 
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""实体提取 - 预编译的单次扫描提取器
+
+金额使用一个合并正则一次扫描得到各类写法的首个匹配，再按原有优先级取值；
+招标类型关键词与地名词表合并为一个 Aho-Corasick 自动机，扫描耗时与词表大小无关。
+"""
+import logging
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from modules.scrapers.matcher import AhoCorasick
+
+logger = logging.getLogger("bidscrap")
+
+# 内置地名词表（省、直辖市及地级行政区）
+DEFAULT_GAZETTEER = os.path.join(os.path.dirname(__file__), "data", "gazetteer.txt")
+
+# 招标类型及其关键词（按顺序判断，先命中的类型优先）
+BID_TYPES = {
+    "公开招标": ["公开招标", "公开"],
+    "邀请招标": ["邀请招标", "邀请", "邀标"],
+    "竞争性谈判": ["竞争性谈判", "竞谈"],
+    "竞争性磋商": ["竞争性磋商", "磋商"],
+    "询价采购": ["询价", "询价采购"],
+    "单一来源": ["单一来源", "单一"],
+    "中标公告": ["中标公告", "中标结果", "中标"],
+    "更正公告": ["更正公告", "变更", "澄清"]
+}
+
+# 金额的各种写法合并为一个正则，一次扫描记录每种写法的首个匹配。
+# ￥/人民币 只用前瞻捕获数字而不消耗，使后面的“数字+单位”仍能被匹配；
+# 单独出现的单位用于判断换算倍数（与原逻辑一致，按全文是否出现该单位）。
+NUMBER_PATTERN = r'\d[\d,]*\.?\d*'
+AMOUNT_PATTERN = re.compile(
+    rf'(?P<number>{NUMBER_PATTERN})\s*(?P<unit>亿元|万元|千元|元|RMB)'
+    rf'|￥\s*(?=(?P<sign>{NUMBER_PATTERN}))'
+    rf'|人民币\s*(?=(?P<cny>{NUMBER_PATTERN}))'
+    r'|(?P<bare_unit>亿元|万元|千元)'
+)
+# 写法优先级：先按单位，其次￥符号、人民币前缀
+AMOUNT_PRIORITY = ("亿元", "万元", "千元", "元", "RMB", "￥", "人民币")
+UNIT_MULTIPLIERS = (("亿元", 100_000_000), ("万元", 10_000), ("千元", 1_000))
+
+# 日期：四位年份优先，其次两位年份
+DATE_PATTERN = re.compile(r'(\d{4}[年/-]\d{1,2}[月/-]\d{1,2}日?)')
+SHORT_DATE_PATTERN = re.compile(r'(\d{2}[年/-]\d{1,2}[月/-]\d{1,2})')
+
+
+def load_gazetteer(path: str) -> List[Tuple[str, List[str]]]:
+    """读取地名词表，返回 [(地区名称, 匹配词列表)]，同名地区合并匹配词"""
+    regions: Dict[str, List[str]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, _, patterns = line.partition("\t")
+            name = name.strip()
+            words = [word.strip() for word in patterns.split(",") if word.strip()] or [name]
+            merged = regions.setdefault(name, [])
+            merged.extend(word for word in words if word not in merged)
+    return list(regions.items())
+
+
+class EntityExtractor:
+    """实体提取器
+
+    招标类型与地区共用一个自动机：一次扫描得到所有命中的关键词，
+    再按招标类型顺序和词表顺序整理结果。
+    """
+
+    def __init__(self, gazetteer: List[Tuple[str, List[str]]]):
+        self.bid_types = list(BID_TYPES)
+        self.locations = [name for name, _ in gazetteer]
+
+        # 关键词 -> [(类别, 序号)]
+        self._owners: Dict[str, List[Tuple[str, int]]] = {}
+        for index, keywords in enumerate(BID_TYPES.values()):
+            for keyword in keywords:
+                self._owners.setdefault(keyword, []).append(("bid_type", index))
+        for index, (_, words) in enumerate(gazetteer):
+            for word in words:
+                self._owners.setdefault(word, []).append(("location", index))
+
+        self._automaton = AhoCorasick(self._owners)
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """提取日期、金额、招标类型与地区，返回格式与 BaseScraper.extract_entities 相同"""
+        entities = {
+            "companies": [],
+            "locations": [],
+            "dates": [],
+            "amounts": [],
+            "bid_type": None
+        }
+        if not text:
+            return entities
+
+        date = self.extract_date(text)
+        if date:
+            entities["dates"].append(date)
+
+        amount = self.extract_amount(text)
+        if amount:
+            entities["amounts"].append(amount)
+
+        bid_type = None
+        locations = set()
+        patterns = self._automaton.patterns
+        for _, pattern_index in self._automaton.iter_matches(text):
+            for kind, index in self._owners[patterns[pattern_index]]:
+                if kind == "location":
+                    locations.add(index)
+                elif bid_type is None or index < bid_type:
+                    bid_type = index
+
+        if bid_type is not None:
+            entities["bid_type"] = self.bid_types[bid_type]
+        entities["locations"] = [self.locations[index] for index in sorted(locations)]
+        return entities
+
+    def extract_locations(self, text: str) -> List[str]:
+        """只提取地区（按词表顺序）"""
+        if not text:
+            return []
+        locations = set()
+        patterns = self._automaton.patterns
+        for _, pattern_index in self._automaton.iter_matches(text):
+            for kind, index in self._owners[patterns[pattern_index]]:
+                if kind == "location":
+                    locations.add(index)
+        return [self.locations[index] for index in sorted(locations)]
+
+    @staticmethod
+    def extract_amount(text: str) -> Optional[float]:
+        """提取金额（元）：按写法优先级取首个匹配，按全文出现的最大单位换算"""
+        if not text:
+            return None
+
+        first: Dict[str, str] = {}
+        units = set()
+        for match in AMOUNT_PATTERN.finditer(text):
+            number, unit, sign, cny, bare_unit = match.group("number", "unit", "sign", "cny", "bare_unit")
+            if unit:
+                units.add(unit)
+                first.setdefault(unit, number)
+            elif sign is not None:
+                first.setdefault("￥", sign)
+            elif cny is not None:
+                first.setdefault("人民币", cny)
+            else:
+                units.add(bare_unit)
+
+        for key in AMOUNT_PRIORITY:
+            if key in first:
+                amount = float(first[key].replace(',', ''))
+                for unit, multiplier in UNIT_MULTIPLIERS:
+                    if unit in units:
+                        amount *= multiplier
+                        break
+                return amount
+
+        return None
+
+    @staticmethod
+    def extract_date(text: str) -> Optional[str]:
+        """提取日期：四位年份优先，标准化年月日写法并补全两位年份"""
+        if not text:
+            return None
+
+        match = DATE_PATTERN.search(text) or SHORT_DATE_PATTERN.search(text)
+        if not match:
+            return None
+
+        date_str = match.group(1).replace('年', '-').replace('月', '-').replace('日', '')
+
+        # 补全年份（如果是两位数）
+        if re.match(r'\d{2}-', date_str):
+            year = int(date_str[:2])
+            current_year = datetime.now().year % 100
+            century = 2000 if year <= current_year else 1900
+            date_str = f"{century + year}{date_str[2:]}"
+
+        return date_str
+
+
+@lru_cache(maxsize=1)
+def get_entity_extractor() -> EntityExtractor:
+    """获取实体提取器（词表只加载一次）"""
+    path = config.GAZETTEER_FILE or DEFAULT_GAZETTEER
+    try:
+        gazetteer = load_gazetteer(path)
+    except OSError as e:
+        logger.error(f"加载地名词表失败: {path}, {str(e)}")
+        gazetteer = []
+    return EntityExtractor(gazetteer)
@@ -0,0 +1,254 @@
+"""企业名称匹配 - 预编译的单公司匹配器与整份名单的多模式匹配器"""
+import re
+from collections import Counter, deque
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 常见企业名称后缀，去掉后得到简称
+SUFFIX_PATTERNS = ["有限公司", "有限责任公司", "股份公司", "股份有限公司", "集团", "集团公司", "企业"]
+
+# 文本分词
+WORD_PATTERN = re.compile(r'[\w\u4e00-\u9fa5]+')
+
+
+def company_abbreviations(company: str) -> List[str]:
+    """按后缀顺序生成公司简称（三个字及以上的公司名才生成）"""
+    abbreviations = []
+    if len(company) >= 3:
+        for pattern in SUFFIX_PATTERNS:
+            if pattern in company:
+                name = company.replace(pattern, "").strip()
+                if name and len(name) >= 2 and name not in abbreviations:
+                    abbreviations.append(name)
+    return abbreviations
+
+
+class CompanyMatcher:
+    """单个公司的匹配器
+
+    创建时预先计算简称、字符计数并编译上下文正则；模糊匹配前先用
+    长度和字符重合度两个上界过滤候选词，只有可能超过阈值的词才计算编辑相似度。
+    """
+
+    def __init__(self, company: str):
+        self.company = company
+        self.abbreviations = company_abbreviations(company)
+        self._char_counts = Counter(company)
+
+        escaped = re.escape(company)
+        self._context_patterns: List[Tuple[str, re.Pattern]] = [
+            # 公司作为投标方
+            ("bidder", re.compile(r'投标人[：:]\s*.*' + escaped)),
+            ("bidder", re.compile(r'中标人[：:]\s*.*' + escaped)),
+            ("bidder", re.compile(r'供应商[：:]\s*.*' + escaped)),
+            ("bidder", re.compile(escaped + r'\s*为?中标单位')),
+            ("bidder", re.compile(escaped + r'\s*成为?供应商')),
+            # 公司作为采购方
+            ("buyer", re.compile(r'采购人[：:]\s*.*' + escaped)),
+            ("buyer", re.compile(r'招标人[：:]\s*.*' + escaped)),
+            ("buyer", re.compile(r'甲方[：:]\s*.*' + escaped)),
+            ("buyer", re.compile(escaped + r'\s*[的]?采购项目')),
+        ]
+
+    def match(self, text: str, threshold: float = 0.8, context_match: bool = True) -> Dict[str, Any]:
+        """判断公司名称是否匹配文本，返回格式与 BaseScraper.is_company_match 相同"""
+        result = {
+            "match": False,
+            "type": None,
+            "score": 0.0,
+            "matched_text": None
+        }
+
+        if not text or not self.company:
+            return result
+
+        # 1. 精确匹配
+        if self.company in text:
+            result.update(match=True, type="exact", score=1.0, matched_text=self.company)
+            return result
+
+        # 2. 简称匹配
+        for name in self.abbreviations:
+            if name in text:
+                result.update(match=True, type="abbreviation", score=0.9, matched_text=name)
+                return result
+
+        # 3. 模糊匹配（取相似度最高的词）
+        best = self._best_fuzzy_word(text, threshold)
+        if best:
+            result.update(match=True, type="fuzzy", score=best[0], matched_text=best[1])
+            return result
+
+        # 4. 上下文匹配
+        if context_match:
+            context = self._match_context(text)
+            if context:
+                result.update(match=True, type=f"context_{context[0]}", score=0.85, matched_text=context[1])
+
+        return result
+
+    def _best_fuzzy_word(self, text: str, threshold: float) -> Optional[Tuple[float, str]]:
+        """返回相似度超过阈值的最佳候选词 (相似度, 词)"""
+        company = self.company
+        length = len(company)
+        best = None
+        checked = set()
+
+        for word in WORD_PATTERN.findall(text):
+            if len(word) < 2 or word in checked:
+                continue
+            checked.add(word)
+            total = length + len(word)
+
+            # 相似度上界一：匹配字符数不超过较短字符串长度
+            if 2.0 * min(length, len(word)) / total <= threshold:
+                continue
+
+            # 相似度上界二：匹配字符数不超过两者的字符重合数
+            available = dict(self._char_counts)
+            overlap = 0
+            for char in word:
+                count = available.get(char)
+                if count:
+                    available[char] = count - 1
+                    overlap += 1
+            if 2.0 * overlap / total <= threshold:
+                continue
+
+            similarity = SequenceMatcher(None, company, word).ratio()
+            if similarity > threshold and (best is None or similarity > best[0]):
+                best = (similarity, word)
+
+        return best
+
+    def _match_context(self, text: str) -> Optional[Tuple[str, str]]:
+        """检查公司是否出现在投标方/采购方上下文中，返回 (角色, 匹配文本)"""
+        # 所有上下文模式都包含完整公司名，文本中没有公司名时不可能命中
+        if self.company not in text:
+            return None
+        for role, pattern in self._context_patterns:
+            match = pattern.search(text)
+            if match:
+                return role, match.group(0)
+        return None
+
+
+@lru_cache(maxsize=4096)
+def get_company_matcher(company: str) -> CompanyMatcher:
+    """获取公司匹配器（按公司名称缓存）"""
+    return CompanyMatcher(company)
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式匹配自动机 - 一次扫描找出文本中出现的所有模式串
+
+    扫描耗时只与文本长度和命中数有关，与模式串数量无关。
+    自动机只由列表和字典组成，可以被pickle传递给子进程。
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        seen = set()
+        for pattern in patterns:
+            if pattern and pattern not in seen:
+                seen.add(pattern)
+                self._add(pattern, len(self.patterns))
+                self.patterns.append(pattern)
+        self._build()
+
+    def _add(self, pattern: str, index: int):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(index)
+
+    def _build(self):
+        """按广度优先计算失败指针，并合并失败链上的输出"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """依次返回 (结束位置, 模式串序号)"""
+        goto, fail, output = self._goto, self._fail, self._output
+        root = goto[0]
+        node = 0
+        for position, char in enumerate(text):
+            if node:
+                next_node = goto[node].get(char)
+                while next_node is None and node:
+                    node = fail[node]
+                    next_node = goto[node].get(char)
+                node = next_node or 0
+            else:
+                # 多数字符不是任何模式串的开头，直接跳过
+                node = root.get(char, 0)
+                if not node:
+                    continue
+            for index in output[node]:
+                yield position, index
+
+    def find(self, text: str) -> List[str]:
+        """返回文本中出现的模式串（按首次出现顺序去重）"""
+        found = {}
+        for _, index in self.iter_matches(text):
+            found.setdefault(index, None)
+        return [self.patterns[index] for index in found]
+
+
+class CompanyListMatcher:
+    """整份企业名单的匹配器
+
+    以名单中的全称和去掉后缀的简称构建自动机，一次扫描即可找出
+    文本提到的所有名单企业。
+    """
+
+    def __init__(self, companies: Iterable[str]):
+        self.companies: List[str] = []
+        self._owners: Dict[str, List[int]] = {}
+        seen = set()
+
+        for company in companies:
+            if not company or company in seen:
+                continue
+            seen.add(company)
+            index = len(self.companies)
+            self.companies.append(company)
+            for name in [company] + company_abbreviations(company):
+                owners = self._owners.setdefault(name, [])
+                if index not in owners:
+                    owners.append(index)
+
+        self._automaton = AhoCorasick(self._owners)
+
+    def find(self, text: str) -> List[str]:
+        """返回文本中提到的名单企业（按名单顺序）"""
+        if not text:
+            return []
+        matched = set()
+        for _, index in self._automaton.iter_matches(text):
+            matched.update(self._owners[self._automaton.patterns[index]])
+        return [self.companies[index] for index in sorted(matched)]
+
+    def __len__(self) -> int:
+        return len(self.companies)
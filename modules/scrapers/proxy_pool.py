@@ -0,0 +1,194 @@
+"""代理池 - 并发检测代理健康状况，按延迟与成功率加权选择代理
+
+每个代理记录延迟（指数滑动平均）、成功率与连续失败次数：
+- validate 通过探测地址并发检测代理，检测结果计入健康统计；
+- 实际请求的结果通过 record 反馈，持续更新健康统计；
+- choose 在健康代理中取延迟最低的若干个，按 成功率/延迟 加权随机选择；
+- acquire 按会话固定代理，同一会话的请求使用同一出口，代理失效时才更换。
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, Hashable, Iterable, List, Optional
+
+import aiohttp
+
+import config
+
+logger = logging.getLogger("bidscrap")
+
+# 延迟滑动平均的权重
+LATENCY_ALPHA = 0.3
+# 成功率滑动平均的权重
+SUCCESS_ALPHA = 0.2
+
+
+class ProxyStats:
+    """单个代理的健康统计"""
+
+    __slots__ = ("proxy", "latency", "success_rate", "consecutive_failures",
+                 "checked", "banned", "last_used")
+
+    def __init__(self, proxy: str):
+        self.proxy = proxy
+        self.latency: Optional[float] = None
+        self.success_rate = 1.0
+        self.consecutive_failures = 0
+        # 是否已有检测或请求结果，未检测的代理不参与选择
+        self.checked = False
+        self.banned = False
+        self.last_used = 0.0
+
+    def record(self, success: bool, latency: float = None):
+        """记录一次检测或请求结果"""
+        self.checked = True
+        self.success_rate += SUCCESS_ALPHA * ((1.0 if success else 0.0) - self.success_rate)
+        if success:
+            self.consecutive_failures = 0
+            if latency is not None:
+                self.latency = latency if self.latency is None else (
+                    self.latency + LATENCY_ALPHA * (latency - self.latency)
+                )
+        else:
+            self.consecutive_failures += 1
+
+    @property
+    def healthy(self) -> bool:
+        return (self.checked and not self.banned and self.latency is not None
+                and self.success_rate >= config.PROXY_MIN_SUCCESS_RATE
+                and self.consecutive_failures < config.PROXY_MAX_CONSECUTIVE_FAILURES)
+
+    @property
+    def weight(self) -> float:
+        """选择权重：成功率越高、延迟越低权重越大"""
+        return self.success_rate / max(self.latency or 0.0, 0.01)
+
+    def to_dict(self) -> dict:
+        return {
+            "proxy": self.proxy,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "success_rate": round(self.success_rate, 3),
+            "consecutive_failures": self.consecutive_failures,
+            "healthy": self.healthy,
+            "banned": self.banned,
+        }
+
+
+class ProxyPool:
+    """代理池
+
+    Args:
+        probe_url: 健康检查的探测地址，返回200视为代理可用
+        probe_timeout: 单次探测超时时间（秒）
+        concurrency: 并发探测的代理数
+        top_n: 加权选择时参与的最快健康代理数
+    """
+
+    def __init__(self, probe_url: str = None, probe_timeout: float = None,
+                 concurrency: int = None, top_n: int = None):
+        self.probe_url = probe_url or config.PROXY_PROBE_URL
+        self.probe_timeout = probe_timeout or config.PROXY_PROBE_TIMEOUT
+        self.concurrency = concurrency or config.PROXY_VALIDATE_CONCURRENCY
+        self.top_n = top_n or config.PROXY_SELECT_TOP
+        self._stats: Dict[str, ProxyStats] = {}
+        self._pinned: Dict[Hashable, str] = {}
+        self.last_validated = 0.0
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    @property
+    def proxies(self) -> List[str]:
+        return list(self._stats)
+
+    def update(self, proxies: Iterable[str]):
+        """替换代理列表，保留仍在列表中的代理的健康统计"""
+        proxies = list(dict.fromkeys(p for p in proxies if p))
+        self._stats = {proxy: self._stats.get(proxy) or ProxyStats(proxy) for proxy in proxies}
+        self._pinned = {key: proxy for key, proxy in self._pinned.items() if proxy in self._stats}
+
+    def stats(self, proxy: str) -> Optional[ProxyStats]:
+        return self._stats.get(proxy)
+
+    def healthy(self) -> List[ProxyStats]:
+        """健康代理，按延迟升序"""
+        return sorted((s for s in self._stats.values() if s.healthy), key=lambda s: s.latency)
+
+    async def validate(self, proxies: Iterable[str] = None) -> int:
+        """并发检测代理（默认检测全部未封禁代理），返回可用代理数"""
+        targets = [s for s in self._stats.values() if not s.banned] if proxies is None else [
+            self._stats[p] for p in proxies if p in self._stats
+        ]
+        if not targets:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.probe_timeout)
+
+        async def probe(session: aiohttp.ClientSession, stats: ProxyStats):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    async with session.get(self.probe_url, proxy=stats.proxy) as response:
+                        await response.read()
+                        success = response.status == 200
+                except Exception as e:
+                    logger.debug(f"代理 {stats.proxy} 检测失败: {str(e)}")
+                    success = False
+                stats.record(success, time.perf_counter() - start)
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            await asyncio.gather(*(probe(session, stats) for stats in targets))
+
+        self.last_validated = time.monotonic()
+        available = sum(1 for stats in targets if stats.healthy)
+        logger.info(f"代理检测完成: {available}/{len(targets)} 个可用")
+        return available
+
+    def record(self, proxy: str, success: bool, latency: float = None):
+        """反馈实际请求的结果"""
+        stats = self._stats.get(proxy)
+        if stats is not None:
+            stats.record(success, latency)
+
+    def ban(self, proxy: str):
+        """封禁代理，固定到该代理的会话会在下次获取时更换"""
+        stats = self._stats.get(proxy)
+        if stats is not None and not stats.banned:
+            stats.banned = True
+            logger.warning(f"代理 {proxy} 已被标记为封禁")
+
+    def choose(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        """在最快的若干个健康代理中按权重随机选择一个"""
+        exclude = set(exclude)
+        candidates = [s for s in self.healthy() if s.proxy not in exclude][:self.top_n]
+        if not candidates:
+            return None
+        chosen = random.choices(candidates, weights=[s.weight for s in candidates])[0]
+        chosen.last_used = time.monotonic()
+        return chosen.proxy
+
+    def acquire(self, session_key: Hashable = None) -> Optional[str]:
+        """获取代理：指定 session_key 时固定使用同一代理，直到其不再健康"""
+        if session_key is None:
+            return self.choose()
+        pinned = self._pinned.get(session_key)
+        if pinned is not None:
+            stats = self._stats.get(pinned)
+            if stats is not None and stats.healthy:
+                return pinned
+        proxy = self.choose()
+        if proxy is None:
+            self._pinned.pop(session_key, None)
+        else:
+            self._pinned[session_key] = proxy
+        return proxy
+
+    def release(self, session_key: Hashable):
+        """解除会话与代理的固定关系"""
+        self._pinned.pop(session_key, None)
+
+    def snapshot(self) -> List[dict]:
+        """各代理的健康统计"""
+        return [stats.to_dict() for stats in self._stats.values()]
@@ -0,0 +1,130 @@
+"""会话池 - 每个爬虫维护少量长期会话，供各公司、各搜索任务共享连接
+
+会话在应用启动时创建（或首次使用时创建），应用关闭时统一关闭，
+避免每个公司都重新建立TCP连接、从冷启动开始保活。
+会话超过 HTTP_SESSION_MAX_AGE 后在空闲时重建，以更换User-Agent与Cookie。
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+import config
+
+logger = logging.getLogger("bidscrap")
+
+
+class PooledSession:
+    """会话池中的一个会话"""
+
+    __slots__ = ("session", "created", "in_use")
+
+    def __init__(self, session):
+        self.session = session
+        self.created = time.monotonic()
+        self.in_use = 0
+
+
+class SessionPool:
+    """单个爬虫的会话池，会话数不超过 size，借出时选择当前使用者最少的会话
+
+    Args:
+        scraper: 爬虫类，通过其 create_session/close_session 创建和关闭会话
+        size: 会话数上限
+        max_age: 会话最长使用时间（秒）
+    """
+
+    def __init__(self, scraper, size: int = None, max_age: float = None):
+        self.scraper = scraper
+        self.size = max(size or config.HTTP_SESSION_POOL_SIZE, 1)
+        self.max_age = max_age or config.HTTP_SESSION_MAX_AGE
+        self._entries: List[PooledSession] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _check_loop(self):
+        """会话绑定创建时的事件循环，事件循环更换后丢弃旧会话"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._entries:
+                logger.debug(f"{self.scraper.name} 的事件循环已更换，丢弃 {len(self._entries)} 个旧会话")
+            self._entries = []
+            self._loop = loop
+
+    def _create(self) -> PooledSession:
+        entry = PooledSession(self.scraper.create_session())
+        self._entries.append(entry)
+        return entry
+
+    async def _discard(self, entry: PooledSession):
+        if entry not in self._entries:
+            return
+        self._entries.remove(entry)
+        self.scraper.proxy_manager.release(id(entry.session))
+        await self.scraper.close_session(entry.session)
+
+    async def start(self):
+        """预先创建全部会话"""
+        self._check_loop()
+        while len(self._entries) < self.size:
+            self._create()
+
+    async def acquire(self):
+        """借出一个会话，用完后调用 release 归还"""
+        self._check_loop()
+        now = time.monotonic()
+        for entry in [e for e in self._entries if not e.in_use and now - e.created > self.max_age]:
+            await self._discard(entry)
+        if len(self._entries) < self.size:
+            entry = self._create()
+        else:
+            entry = min(self._entries, key=lambda e: e.in_use)
+        entry.in_use += 1
+        return entry.session
+
+    def release(self, session):
+        """归还会话"""
+        for entry in self._entries:
+            if entry.session is session:
+                entry.in_use -= 1
+                return
+
+    async def close(self):
+        """关闭全部会话"""
+        entries, self._entries = self._entries, []
+        for entry in entries:
+            self.scraper.proxy_manager.release(id(entry.session))
+            try:
+                await self.scraper.close_session(entry.session)
+            except Exception as e:
+                logger.error(f"关闭 {self.scraper.name} 的会话出错: {str(e)}")
+
+
+# 爬虫名称 -> 会话池
+_session_pools: Dict[str, SessionPool] = {}
+
+
+def get_session_pool(scraper) -> SessionPool:
+    """获取爬虫的会话池（首次调用时创建）"""
+    pool = _session_pools.get(scraper.name)
+    if pool is None:
+        pool = _session_pools[scraper.name] = SessionPool(scraper)
+    return pool
+
+
+async def start_session_pools(scrapers: Iterable):
+    """应用启动时为各爬虫创建会话"""
+    for scraper in scrapers:
+        if not hasattr(scraper, "create_session"):
+            continue
+        try:
+            await get_session_pool(scraper).start()
+        except Exception as e:
+            logger.error(f"创建 {scraper.name} 的会话池出错: {str(e)}")
+
+
+async def close_session_pools():
+    """关闭全部会话池（应用关闭时调用）"""
+    pools = list(_session_pools.values())
+    _session_pools.clear()
+    for pool in pools:
+        await pool.close()
@@ -0,0 +1,196 @@
+"""请求节流 - 按主机限制并发请求与请求频率"""
+import asyncio
+import logging
+import time
+from typing import Dict, Tuple
+from urllib.parse import urlparse
+
+import config
+
+logger = logging.getLogger("bidscrap")
+
+
+def get_host(url: str) -> str:
+    """提取URL中的主机名（含端口）"""
+    return urlparse(url).netloc.lower()
+
+
+class HostConcurrencyLimiter:
+    """主机并发限制器 - 同一主机的并发请求共享一个信号量"""
+
+    def __init__(self, default_limit: int = None):
+        self.default_limit = default_limit
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def get(self, url: str, limit: int = None) -> asyncio.Semaphore:
+        """获取URL所属主机的信号量，首次创建时确定上限"""
+        host = get_host(url)
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            limit = limit or self.default_limit or config.DETAIL_CONCURRENCY_PER_HOST
+            semaphore = asyncio.Semaphore(limit)
+            self._semaphores[host] = semaphore
+            logger.debug(f"主机 {host} 的并发上限为 {limit}")
+        return semaphore
+
+
+# 进程级主机并发限制器
+host_limiter = HostConcurrencyLimiter()
+
+
+class TokenBucket:
+    """令牌桶 - 以固定速率补充令牌，允许有限突发
+
+    采用预约方式：取令牌时立即扣减（可为负数），再等待欠下的令牌补齐，
+    因此大量协程同时请求时也不会超出设定速率。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """预约一个令牌，返回需要等待的秒数"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    async def acquire(self):
+        """获取一个令牌，必要时等待"""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """进程级限速器 - 按 (爬虫, 主机) 维护独立的令牌桶"""
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def get_bucket(self, scraper_name: str, url: str, rate: float, burst: int = 1) -> TokenBucket:
+        """获取令牌桶，配置变化时重建"""
+        key = (scraper_name, get_host(url))
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.rate != rate or bucket.capacity != max(burst, 1):
+            bucket = TokenBucket(rate, burst)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, scraper_name: str, url: str, rate: float, burst: int = 1):
+        """按频率限制等待发送请求的许可，rate为每秒请求数，不大于0时不限速"""
+        if not rate or rate <= 0:
+            return
+        await self.get_bucket(scraper_name, url, rate, burst).acquire()
+
+
+# 进程级限速器
+rate_limiter = RateLimiter()
+
+
+class HostCircuitBreaker:
+    """主机熔断器 - 站点开始限流或持续出错时，暂停对该主机的所有请求
+
+    连续失败达到阈值（或服务器返回429明确限流）后进入熔断状态，
+    在冷却时间内所有请求都等待而不是继续发送；冷却结束后只放行一个试探请求，
+    成功则恢复，失败则冷却时间加倍（不超过上限）。
+    """
+
+    def __init__(self, host: str, threshold: int = None, cooldown: float = None,
+                 max_cooldown: float = None):
+        self.host = host
+        self.threshold = threshold or config.CIRCUIT_BREAKER_THRESHOLD
+        self.base_cooldown = cooldown or config.CIRCUIT_BREAKER_COOLDOWN
+        self.max_cooldown = max_cooldown or config.CIRCUIT_BREAKER_MAX_COOLDOWN
+        self.cooldown = self.base_cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        # 试探请求的开始时间，0 表示没有进行中的试探
+        self.probe_started = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.open_until > 0
+
+    async def acquire(self) -> float:
+        """等待发送请求的许可：熔断期间等待冷却结束，试探期间等待试探结果
+
+        Returns:
+            放行的是试探请求时返回试探标识（交给 release_probe），否则返回0
+        """
+        while self.is_open:
+            now = time.monotonic()
+            if now < self.open_until:
+                await asyncio.sleep(self.open_until - now)
+                continue
+            # 冷却结束：放行一个试探请求；试探长时间没有结果时另行放行
+            if not self.probe_started or now - self.probe_started > self.cooldown:
+                self.probe_started = now
+                return now
+            await asyncio.sleep(min(1.0, self.cooldown))
+        return 0.0
+
+    def release_probe(self, probe: float):
+        """结束未得出结论的试探请求（如请求被取消或出现与主机无关的错误），允许立即放行新的试探
+
+        试探已由 record_success/record_failure 处理，或已被新的试探取代时不做任何事。
+        """
+        if probe and self.probe_started == probe:
+            self.probe_started = 0.0
+
+    def record_success(self):
+        """记录站点正常响应"""
+        if self.is_open:
+            logger.info(f"主机 {self.host} 已恢复，解除熔断")
+        self.failures = 0
+        self.open_until = 0.0
+        self.probe_started = 0.0
+        self.cooldown = self.base_cooldown
+
+    def record_failure(self, retry_after: float = None, throttled: bool = False):
+        """记录可重试的失败（超时、连接错误、429或5xx）
+
+        Args:
+            retry_after: 服务器 Retry-After 要求的等待秒数
+            throttled: 服务器明确限流（429），立即暂停该主机的请求
+        """
+        now = time.monotonic()
+        self.failures += 1
+        if self.probe_started:
+            # 试探失败，延长冷却时间
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self.probe_started = 0.0
+            self._open(now, max(self.cooldown, retry_after or 0))
+        elif throttled:
+            self._open(now, retry_after or self.cooldown)
+        elif self.failures >= self.threshold:
+            self._open(now, max(self.cooldown, retry_after or 0))
+
+    def _open(self, now: float, seconds: float):
+        seconds = min(seconds, self.max_cooldown)
+        if now + seconds > self.open_until:
+            if not self.is_open:
+                logger.warning(f"主机 {self.host} 请求失败 {self.failures} 次，暂停请求 {seconds:.1f} 秒")
+            self.open_until = now + seconds
+
+
+class CircuitBreakerRegistry:
+    """按主机维护熔断器，同一主机的所有爬虫与任务共享"""
+
+    def __init__(self):
+        self._breakers: Dict[str, HostCircuitBreaker] = {}
+
+    def get(self, url: str) -> HostCircuitBreaker:
+        host = get_host(url)
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = HostCircuitBreaker(host)
+        return breaker
+
+
+# 进程级熔断器
+circuit_breakers = CircuitBreakerRegistry()
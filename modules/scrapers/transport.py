@@ -0,0 +1,135 @@
+"""HTTP传输层 - 为爬虫提供非阻塞的请求发送能力
+
+aiohttp会话直接在事件循环中异步发送请求；requests等同步会话则放入
+受管理的线程池执行，避免阻塞整个事件循环。
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import aiohttp
+
+import config
+
+logger = logging.getLogger("bidscrap")
+
+# 同步会话使用的线程池（延迟创建）
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """获取同步请求使用的线程池"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=config.HTTP_THREAD_POOL_SIZE,
+            thread_name_prefix="bidscrap-http"
+        )
+    return _executor
+
+
+def shutdown_executor():
+    """关闭同步请求线程池（应用关闭时调用）"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def create_connector() -> aiohttp.TCPConnector:
+    """创建带连接数与保活限制的连接器，必须在事件循环中调用"""
+    return aiohttp.TCPConnector(
+        limit=config.HTTP_POOL_CONNECTIONS,
+        limit_per_host=config.HTTP_POOL_CONNECTIONS_PER_HOST,
+        keepalive_timeout=config.HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=config.HTTP_DNS_CACHE_TTL,
+    )
+
+
+def create_client_session(headers: Dict[str, str] = None,
+                          cookies: dict = None) -> aiohttp.ClientSession:
+    """创建aiohttp会话，必须在事件循环中调用"""
+    return aiohttp.ClientSession(headers=headers, cookies=cookies, connector=create_connector())
+
+
+class TransportResponse(NamedTuple):
+    """HTTP响应：状态码、响应文本与响应头（键为小写）"""
+    status: int
+    text: Optional[str]
+    headers: Dict[str, str]
+
+
+async def send_request(session, url: str, method: str = "GET",
+                       timeout: float = None, **kwargs) -> Tuple[int, Optional[str]]:
+    """发送HTTP请求并返回(状态码, 响应文本)
+
+    Args:
+        session: aiohttp.ClientSession 或 requests.Session
+        url: 请求地址
+        method: 请求方法
+        timeout: 单次请求超时时间（秒）
+        **kwargs: 透传给底层会话的参数（params、headers、data、proxy等）
+    """
+    response = await fetch(session, url, method, timeout, **kwargs)
+    return response.status, response.text
+
+
+async def fetch(session, url: str, method: str = "GET",
+                timeout: float = None, **kwargs) -> TransportResponse:
+    """发送HTTP请求并返回包含响应头的完整响应，参数同 send_request"""
+    if isinstance(session, aiohttp.ClientSession):
+        return await _send_async(session, url, method, timeout, **kwargs)
+    return await _send_blocking(session, url, method, timeout, **kwargs)
+
+
+async def _send_async(session: aiohttp.ClientSession, url: str, method: str,
+                      timeout: Optional[float], **kwargs) -> TransportResponse:
+    """通过aiohttp发送请求"""
+    # 兼容requests风格的代理参数
+    proxies = kwargs.pop("proxies", None)
+    if proxies and "proxy" not in kwargs:
+        kwargs["proxy"] = proxies.get("http") or proxies.get("https")
+    if "proxy" not in kwargs and getattr(session, "_proxy", None):
+        kwargs["proxy"] = session._proxy
+    if kwargs.pop("verify", True) is False:
+        kwargs["ssl"] = False
+
+    if timeout is not None:
+        kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+    async with session.request(method.upper(), url, **kwargs) as response:
+        text = await response.text(errors="replace")
+        headers = {key.lower(): value for key, value in response.headers.items()}
+        return TransportResponse(response.status, text, headers)
+
+
+async def _send_blocking(session, url: str, method: str,
+                         timeout: Optional[float], **kwargs) -> TransportResponse:
+    """在线程池中通过同步会话发送请求"""
+    # 将aiohttp风格的代理参数转换为requests的proxies参数
+    proxy_url = kwargs.pop("proxy", None)
+    if proxy_url:
+        kwargs["proxies"] = {"http": proxy_url, "https": proxy_url}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(
+        get_executor(),
+        partial(session.request, method.upper(), url, **kwargs)
+    )
+    headers = {key.lower(): value for key, value in response.headers.items()}
+    return TransportResponse(response.status_code, response.text, headers)
+
+
+async def close_session(session: Any):
+    """关闭会话，兼容异步和同步会话"""
+    if session is None:
+        return
+    if isinstance(session, aiohttp.ClientSession):
+        if not session.closed:
+            await session.close()
+    else:
+        session.close()
@@ -0,0 +1,153 @@
+"""增量抓取水位 - 记录每个 (爬虫, 公司) 已抓取到的最新公告"""
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Iterable, Optional
+
+import config
+
+logger = logging.getLogger("bidscrap")
+
+# 每个水位最多保留的最新发布时间下的URL数量
+MAX_WATERMARK_URLS = 200
+
+# 发布日期：年、月、日及可选的时、分、秒
+PUBLISH_DATE_PATTERN = re.compile(
+    r'(\d{4})[.\-/年](\d{1,2})[.\-/月](\d{1,2})日?(?:\s*(\d{1,2}):(\d{2})(?::(\d{2}))?)?'
+)
+
+
+def parse_publish_date(text: str) -> Optional[str]:
+    """将发布日期文本解析为可比较的 "YYYY-MM-DD HH:MM:SS" 字符串"""
+    if not text:
+        return None
+    match = PUBLISH_DATE_PATTERN.search(text)
+    if not match:
+        return None
+    year, month, day, hour, minute, second = match.groups()
+    return (f"{int(year):04d}-{int(month):02d}-{int(day):02d} "
+            f"{int(hour or 0):02d}:{int(minute or 0):02d}:{int(second or 0):02d}")
+
+
+class Watermark:
+    """单次抓取使用的水位
+
+    latest_date/urls 为上次已抓取到的最新发布时间及该时间下的公告URL；
+    抓取过程中通过 observe 记录新出现的公告，结束后用 advanced 得到新水位。
+    """
+
+    def __init__(self, latest_date: str = None, urls: Iterable[str] = None):
+        self.latest_date = latest_date
+        self.urls = set(urls or [])
+        self.reached = False
+        self._new_date = latest_date
+        self._new_urls = set(self.urls)
+
+    def is_known(self, url: str, date_text: str) -> bool:
+        """判断公告是否已在上次抓取中见过"""
+        if url and url in self.urls:
+            return True
+        date = parse_publish_date(date_text)
+        return bool(self.latest_date and date and date < self.latest_date)
+
+    def observe(self, url: str, date_text: str):
+        """记录本次抓取看到的新公告"""
+        date = parse_publish_date(date_text)
+        if not date or not url:
+            return
+        if self._new_date is None or date > self._new_date:
+            self._new_date = date
+            self._new_urls = {url}
+        elif date == self._new_date and len(self._new_urls) < MAX_WATERMARK_URLS:
+            self._new_urls.add(url)
+
+    def advanced(self) -> "Watermark":
+        """返回包含本次新公告的水位"""
+        return Watermark(self._new_date, self._new_urls)
+
+
+class WatermarkStore:
+    """水位存储 - 基于SQLite持久化"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS watermarks (
+                scraper TEXT NOT NULL,
+                company TEXT NOT NULL,
+                latest_date TEXT,
+                urls TEXT NOT NULL,
+                PRIMARY KEY (scraper, company)
+            )
+        """)
+        self._conn.commit()
+
+    def load(self, scraper: str, company: str) -> Watermark:
+        """读取水位，不存在时返回空水位"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latest_date, urls FROM watermarks WHERE scraper = ? AND company = ?",
+                (scraper, company)
+            ).fetchone()
+        if row is None:
+            return Watermark()
+        return Watermark(row[0], json.loads(row[1]))
+
+    def save(self, scraper: str, company: str, watermark: Watermark):
+        """保存水位，只会向更新的发布时间推进"""
+        if not watermark.latest_date:
+            return
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latest_date, urls FROM watermarks WHERE scraper = ? AND company = ?",
+                (scraper, company)
+            ).fetchone()
+            latest_date, urls = watermark.latest_date, set(watermark.urls)
+            if row and row[0]:
+                if row[0] > latest_date:
+                    return
+                if row[0] == latest_date:
+                    urls |= set(json.loads(row[1]))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks (scraper, company, latest_date, urls) VALUES (?, ?, ?, ?)",
+                (scraper, company, latest_date,
+                 json.dumps(sorted(urls)[:MAX_WATERMARK_URLS], ensure_ascii=False))
+            )
+            self._conn.commit()
+
+    async def aload(self, scraper: str, company: str) -> Watermark:
+        return await asyncio.to_thread(self.load, scraper, company)
+
+    async def asave(self, scraper: str, company: str, watermark: Watermark):
+        await asyncio.to_thread(self.save, scraper, company, watermark)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# 进程级水位存储实例（延迟创建）
+_watermark_store: Optional[WatermarkStore] = None
+
+
+def get_watermark_store() -> WatermarkStore:
+    """获取水位存储"""
+    global _watermark_store
+    if _watermark_store is None:
+        _watermark_store = WatermarkStore(os.path.join(config.OUTPUT_DIR, "state", "watermarks.sqlite3"))
+    return _watermark_store
+
+
+def close_watermark_store():
+    """关闭水位存储（应用关闭时调用）"""
+    global _watermark_store
+    if _watermark_store is not None:
+        _watermark_store.close()
+        _watermark_store = None
@@ -0,0 +1,66 @@
+"""解析进程池 - 在子进程中执行HTML解析与公司匹配等CPU密集型工作
+
+子进程按爬虫名称找到已注册的爬虫类并调用其解析方法，参数与返回值
+只包含字符串、字典、列表等可序列化的普通对象。
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+import config
+
+logger = logging.getLogger("bidscrap")
+
+# 进程级解析进程池（延迟创建）
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+# 子进程中已注册的爬虫
+_worker_scrapers: Dict[str, Any] = {}
+
+
+def _init_worker():
+    """子进程初始化：加载所有爬虫模块"""
+    from modules.scrapers import load_scrapers
+    _worker_scrapers.update(load_scrapers())
+
+
+def call_scraper_method(scraper_name: str, method: str, args: tuple, kwargs: dict) -> Any:
+    """在子进程中调用爬虫的解析方法"""
+    scraper = _worker_scrapers.get(scraper_name)
+    if scraper is None:
+        raise ValueError(f"子进程中未找到爬虫: {scraper_name}")
+    return getattr(scraper, method)(*args, **kwargs)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """获取解析进程池"""
+    global _process_pool
+    if _process_pool is None:
+        workers = config.PARSE_PROCESS_WORKERS or os.cpu_count() or 1
+        # spawn 启动的子进程不会继承事件循环与线程池的状态，各平台行为一致
+        _process_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        logger.info(f"已创建解析进程池，进程数: {workers}")
+    return _process_pool
+
+
+async def run_in_process_pool(scraper_name: str, method: str, *args, **kwargs) -> Any:
+    """在解析进程池中执行爬虫的解析方法"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_process_pool(), call_scraper_method, scraper_name, method, args, kwargs
+    )
+
+
+def shutdown_process_pool(wait: bool = False):
+    """关闭解析进程池（应用关闭时调用）"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=wait, cancel_futures=True)
+        _process_pool = None